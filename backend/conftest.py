@@ -0,0 +1,114 @@
+"""
+Shared pytest configuration for the backend test suites.
+
+Response bodies are decoded with orjson: the session-scoped autouse
+`orjson_responses` fixture patches httpx.Response.json (what TestClient
+returns) for the test run and restores it afterwards.
+
+Tests marked @pytest.mark.slow (multi-voter end-to-end scenarios) are
+skipped unless --runslow is given.
+
+Parallel runs (pytest-xdist): both suites create, empty or drop tables
+around each test, so workers cannot share a schema. Each worker is pointed
+at its own database, <DB_NAME>_<worker id> (e.g. promisethread_gw0),
+created on first use. Creating it needs the CREATEDB privilege
+(ALTER ROLE promisethread CREATEDB) and access to the "postgres" database;
+without them (and no pre-created worker databases) workers fall back to
+the shared database with a warning - run serially (no -n) in that case.
+
+The `now` fixture is one timezone-aware timestamp for the whole run; test
+dates (deadlines, grace periods) are offsets from it.
+"""
+
+import os
+from datetime import datetime, timezone
+
+import httpx
+import orjson
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+
+
+_stdlib_response_json = httpx.Response.json
+
+
+def _orjson_response_json(self, **kwargs):
+    """httpx.Response.json via orjson (stdlib json if json.loads kwargs are passed).
+    Note orjson reads integers wider than 64 bits as floats; the API sends
+    hashes and field elements as strings."""
+    if kwargs:
+        return _stdlib_response_json(self, **kwargs)
+    return orjson.loads(self.content)
+
+
+# SQLSTATE insufficient_privilege
+_PG_INSUFFICIENT_PRIVILEGE = "42501"
+
+
+def _use_worker_database(config, worker: str) -> None:
+    """
+    Create (if needed) and switch database.py to this worker's database.
+    Keeps the shared database (with a warning) if the role may not create it.
+    """
+    import database  # owns the connection URL (env vars and defaults)
+
+    url = database.engine.url
+    worker_db = f"{url.database}_{worker}"
+
+    admin = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        with admin.connect() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": worker_db}
+            ).scalar()
+            if not exists:
+                conn.execute(text(f'CREATE DATABASE "{worker_db}"'))
+    except DBAPIError as e:
+        if getattr(e.orig, "pgcode", None) != _PG_INSUFFICIENT_PRIVILEGE:
+            raise
+        config.issue_config_time_warning(pytest.PytestConfigWarning(
+            f"cannot create {worker_db} (role {url.username!r} lacks CREATEDB); "
+            f"worker {worker} uses the shared database {url.database!r} and may "
+            "interfere with other workers - run without -n"
+        ), stacklevel=2)
+        return
+    finally:
+        admin.dispose()
+
+    database.use_database(url.set(database=worker_db).render_as_string(hide_password=False))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def orjson_responses():
+    """Decode response bodies with orjson for the run; undone at session end."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(httpx.Response, "json", _orjson_response_json)
+        yield
+
+
+@pytest.fixture(scope="session")
+def now() -> datetime:
+    """Wall-clock time, read once per run (UTC)."""
+    return datetime.now(timezone.utc)
+
+
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", default=False,
+                     help="also run tests marked slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow scenario: pass --runslow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+def pytest_configure(config):
+    # Runs before the test modules import database.engine
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if worker:
+        _use_worker_database(config, worker)
@@ -15,13 +15,15 @@ import json
 import os
 import secrets
 from datetime import datetime, timezone
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Union
 
 # Try to import eth_account, fall back to simulation if not available
 try:
     from eth_account import Account
     from eth_account.messages import encode_defunct
     from web3 import Web3
+    from eth_hash.auto import keccak
+    from hexbytes import HexBytes
     ETH_AVAILABLE = True
 except ImportError:
     ETH_AVAILABLE = False
@@ -157,7 +159,7 @@ def decrypt_keystore(keystore: Dict[str, Any], passphrase: str) -> Optional[str]
 # HASHING
 # =============================================================================
 
-def compute_manifesto_hash(manifesto_text: str) -> str:
+def compute_manifesto_hash(*parts: Union[str, bytes]) -> str:
     """
     Compute keccak256 hash of manifesto text (matches Solidity keccak256).
     
@@ -167,18 +169,50 @@ def compute_manifesto_hash(manifesto_text: str) -> str:
     IMPORTANT: Uses keccak256 to match smart contract implementation.
     
     Args:
-        manifesto_text: Full manifesto text
+        *parts: Manifesto text, optionally split into pieces (str or bytes).
+                The pieces are fed to the hasher in order, so
+                compute_manifesto_hash(title, ":", description) equals
+                compute_manifesto_hash(f"{title}:{description}") without
+                building the joined string.
         
     Returns:
         Hash as hex string (0x...)
     """
     if ETH_AVAILABLE:
         # Use proper keccak256 (matches Solidity)
-        return Web3.keccak(text=manifesto_text).hex()
+        hasher = keccak.new(b"")
     else:
         # Fallback for development (not cryptographically equivalent!)
-        hash_bytes = hashlib.sha256(manifesto_text.encode('utf-8')).digest()
-        return "0x" + hash_bytes.hex()
+        hasher = hashlib.sha256()
+    
+    for part in parts:
+        hasher.update(part.encode('utf-8') if isinstance(part, str) else part)
+    
+    if ETH_AVAILABLE:
+        # Same formatting as Web3.keccak(text=...).hex()
+        return HexBytes(hasher.digest()).hex()
+    return "0x" + hasher.digest().hex()
+
+
+def generate_block_hash(data: Union[str, bytes], prev_hash: str) -> str:
+    """
+    Hash of an audit-trail block: sha256 of "<data>:<prev_hash>".
+    
+    Shared by the API and seed_data.py so every block in the chain can be
+    re-verified the same way: data is "GENESIS" for the genesis block and
+    str(manifesto_id) for every manifesto block.
+    
+    Args:
+        data: Block payload (str is UTF-8 encoded; bytes are hashed as-is)
+        prev_hash: block_hash of the previous block (0x...)
+        
+    Returns:
+        Hash as hex string (0x...)
+    """
+    hasher = hashlib.sha256(data.encode('utf-8') if isinstance(data, str) else data)
+    hasher.update(b":")
+    hasher.update(prev_hash.encode('utf-8'))
+    return "0x" + hasher.hexdigest()
 
 
 def compute_message_hash(message: str) -> bytes:
@@ -268,7 +302,22 @@ def verify_signature(
         return False, None
 
 
-def create_signature(message: str, private_key: str) -> str:
+def load_signing_key(private_key: str) -> Any:
+    """
+    Parse a private key once for repeated create_signature() calls.
+    
+    Args:
+        private_key: Private key (0x...)
+        
+    Returns:
+        eth_account LocalAccount (or the key string itself in simulated mode)
+    """
+    if ETH_AVAILABLE:
+        return Account.from_key(private_key)
+    return private_key
+
+
+def create_signature(message: str, private_key: Any) -> str:
     """
     Create a signature for a message.
     
@@ -277,7 +326,8 @@ def create_signature(message: str, private_key: str) -> str:
     
     Args:
         message: Message to sign
-        private_key: Private key (0x...)
+        private_key: Private key (0x...), or a key from load_signing_key()
+                     to skip re-parsing it on every call
         
     Returns:
         Signature as hex string
@@ -285,7 +335,10 @@ def create_signature(message: str, private_key: str) -> str:
     if ETH_AVAILABLE:
         message_hash = compute_message_hash(message)
         signable = encode_defunct(message_hash)
-        signed = Account.sign_message(signable, private_key)
+        if isinstance(private_key, str):
+            signed = Account.sign_message(signable, private_key)
+        else:
+            signed = private_key.sign_message(signable)
         return signed.signature.hex()
     else:
         # Simulated signature for development
@@ -12,6 +12,7 @@ Credentials:
 """
 
 import os
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
@@ -60,19 +61,60 @@ print(f"""
 # ENGINE AND SESSION SETUP
 # =============================================================================
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    pool_size=10,           # Number of connections to keep open
-    max_overflow=20,        # Additional connections when pool is full
-    pool_pre_ping=True,     # Check connection health before using
-    echo=False              # Set True to see SQL queries (debugging)
-)
+def json_serializer(obj) -> str:
+    """
+    JSON/JSONB bind serializer (orjson instead of json.dumps).
+    Also passes orjson.Fragment values through as-is, so callers that already
+    hold serialized bytes (e.g. hashed audit block data) don't serialize twice.
+    """
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def make_engine(url: str):
+    """Create an engine for `url` with the app's pool and JSON settings."""
+    # psycopg2 executemany tuning: plain INSERT executemany already goes through
+    # insertmanyvalues; "values_plus_batch" also pages UPDATE/DELETE executemany
+    # through execute_batch instead of one round trip per row.
+    # (Only the psycopg2 dialect understands these arguments.)
+    dialect_kwargs = {}
+    if url.startswith(("postgresql://", "postgresql+psycopg2://")):
+        dialect_kwargs = {
+            "executemany_mode": "values_plus_batch",
+            "executemany_batch_page_size": 500,
+        }
+    
+    # Create engine with connection pooling
+    return create_engine(
+        url,
+        pool_size=10,           # Number of connections to keep open
+        max_overflow=20,        # Additional connections when pool is full
+        pool_pre_ping=True,     # Check connection health before using
+        insertmanyvalues_page_size=1000,  # Rows per multi-row INSERT for bulk inserts
+        json_serializer=json_serializer,
+        echo=False,             # Set True to see SQL queries (debugging)
+        **dialect_kwargs
+    )
+
+
+engine = make_engine(DATABASE_URL)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def use_database(url: str) -> None:
+    """
+    Point `engine` and `SessionLocal` at another database.
+    Used by the test suites to give each pytest-xdist worker its own
+    database; modules must look up `database.engine` after this runs.
+    """
+    global DATABASE_URL, engine
+    engine.dispose()
+    DATABASE_URL = url
+    engine = make_engine(url)
+    SessionLocal.configure(bind=engine)
+
+
 # =============================================================================
 # DEPENDENCY INJECTION FOR FASTAPI
 # =============================================================================
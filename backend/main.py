@@ -16,18 +16,21 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta, timezone
-import hashlib
+from hashlib import sha256  # OpenSSL-backed (_hashlib.openssl_sha256)
+import re
 import secrets
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy import func, or_, desc
 
 from database import get_db, init_db, check_connection
 from models import (
     Voter, ZKCredential, Representative, Manifesto as ManifestoModel,
-    ManifestoVote, Comment as CommentModel, CommentVote, AuditLog, MerkleRoot
+    ManifestoVote, Comment as CommentModel, CommentVote, AuditLog, MerkleRoot,
+    RepresentativeKeyEvent, KEY_STATE_REVOKED, KEY_STATE_REVOKED_LOST,
+    KEY_STATE_REVOKED_COMPROMISED, KEY_STATE_REVOKED_OTHER, KEY_STATE_ROTATED
 )
 from crypto_utils import (
-    generate_key_pair, create_encrypted_keystore, compute_manifesto_hash,
+    generate_key_pair, create_encrypted_keystore, compute_manifesto_hash, generate_block_hash,
     verify_signature, get_verification_bundle, is_valid_address, format_address_short
 )
 from blockchain_service import get_blockchain_service, BlockchainService
@@ -57,13 +60,12 @@ def get_merkle_tree(db: Session) -> tuple[MerkleTree, str, List[str]]:
     return registry.merkle_tree, registry.merkle_tree.root, registry.leaves
 
 
+_SLUG_STRIP = re.compile(r'[^\w\s-]')
+_SLUG_DASH = re.compile(r'[-\s]+')
+
 def generate_slug(name: str) -> str:
     """Generate URL-friendly slug from name."""
-    import re
-    slug = name.lower()
-    slug = re.sub(r'[^\w\s-]', '', slug)
-    slug = re.sub(r'[-\s]+', '-', slug)
-    return slug.strip('-')
+    return _SLUG_DASH.sub('-', _SLUG_STRIP.sub('', name.lower())).strip('-')
 
 
 # CORS middleware
@@ -190,11 +192,11 @@ class Feedback(BaseModel):
 # ============= Utility Functions =============
 
 def generate_hash(data: str) -> str:
-    return "0x" + hashlib.sha256(data.encode()).hexdigest()[:40]
+    return "0x" + sha256(data.encode()).hexdigest()[:40]
 
 def compute_expected_nullifier(voter_id: str, secret: str = DEMO_SECRET) -> str:
     combined = f"{voter_id}:{secret}"
-    return "0x" + hashlib.sha256(combined.encode()).hexdigest()
+    return "0x" + sha256(combined.encode()).hexdigest()
 
 def generate_nullifier() -> str:
     return "0x" + secrets.token_hex(16)
@@ -215,9 +217,30 @@ def get_current_block() -> int:
     elapsed_seconds = (datetime.now() - datetime(2023, 10, 1)).total_seconds()
     return base_block + int(elapsed_seconds / 12)
 
-def generate_block_hash(data: str, prev_hash: str) -> str:
-    combined = f"{data}:{prev_hash}".encode('utf-8')
-    return '0x' + hashlib.sha256(combined).hexdigest()
+KEY_REVOKE_REASONS = {
+    "lost": KEY_STATE_REVOKED_LOST,
+    "compromised": KEY_STATE_REVOKED_COMPROMISED,
+}
+
+def revoke_and_rotate_key(db: Session, representative: Representative, reason: Optional[str] = None):
+    """
+    Log revocation of the representative's current key and mark the
+    replacement key as active (rotated). Call BEFORE swapping in the new
+    wallet address / key version.
+    """
+    revoked_state = (
+        KEY_REVOKE_REASONS.get(reason)
+        or (representative.key_state or 0) & KEY_STATE_REVOKED
+        or KEY_STATE_REVOKED_OTHER
+    )
+    db.add(RepresentativeKeyEvent(
+        representative_id=representative.id,
+        key_version=representative.key_version or 1,
+        key_state=(representative.key_state or 0) | revoked_state,
+        wallet_address=representative.wallet_address,
+        reason=reason
+    ))
+    representative.key_state = KEY_STATE_ROTATED
 
 
 # ============= Voter Registry Endpoints =============
@@ -740,7 +763,10 @@ async def get_manifestos(
         q = q.filter(ManifestoModel.representative_id == representative_id)
     
     total = q.count()
-    manifestos = q.order_by(ManifestoModel.created_at.desc()).offset(offset).limit(limit).all()
+    # Fill m.representative from the join instead of one lazy load per representative
+    manifestos = q.options(contains_eager(ManifestoModel.representative)).order_by(
+        ManifestoModel.created_at.desc()
+    ).offset(offset).limit(limit).all()
     
     now = datetime.now(timezone.utc)
     results = []
@@ -1016,9 +1042,16 @@ async def submit_vote(vote: VoteRequest, db: Session = Depends(get_db)):
     )
 
 @app.get("/api/votes/verify/{vote_hash}")
-async def verify_vote(vote_hash: str, db: Session = Depends(get_db)):
-    """Verify a vote was recorded."""
-    vote = db.query(ManifestoVote).filter(ManifestoVote.vote_hash == vote_hash).first()
+async def verify_vote(vote_hash: str, manifesto_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Verify a vote was recorded.
+    Pass `manifesto_id` when known: the lookup then reads one vote
+    partition instead of all of them.
+    """
+    query = db.query(ManifestoVote).filter(ManifestoVote.vote_hash == vote_hash)
+    if manifesto_id is not None:
+        query = query.filter(ManifestoVote.manifesto_id == manifesto_id)
+    vote = query.first()
     
     if vote:
         return {
@@ -1154,26 +1187,30 @@ async def create_comment(comment: CommentCreate, db: Session = Depends(get_db)):
     similarity_service = get_similarity_service()
     
     # Get recent comments for spam detection (last 200)
-    recent_comments = db.query(CommentModel.content).filter(
+    recent_comments = db.query(CommentModel.content, CommentModel.content_minhash).filter(
         CommentModel.manifesto_id == comment.manifesto_id,
         CommentModel.is_deleted == False
     ).order_by(desc(CommentModel.created_at)).limit(200).all()
-    recent_texts = [c.content for c in recent_comments]
     
     # Get same author's recent comments
-    same_author_comments = db.query(CommentModel.content).filter(
+    same_author_comments = db.query(CommentModel.content, CommentModel.content_minhash).filter(
         CommentModel.session_id == session_id,
         CommentModel.is_deleted == False
     ).order_by(desc(CommentModel.created_at)).limit(20).all()
-    same_author_texts = [c.content for c in same_author_comments]
+    
+    # Stored MinHash signatures (hash older rows that predate the column)
+    spam_signatures = [
+        c.content_minhash if c.content_minhash is not None else similarity_service.minhash(c.content)
+        for c in recent_comments + same_author_comments
+    ]
     
     # Analyze comment for moderation
     analysis = similarity_service.analyze_comment(
         comment=comment.content,
         manifesto_title=manifesto.title,
         manifesto_description=manifesto.description or "",
-        recent_comments=recent_texts,
-        same_author_comments=same_author_texts
+        manifesto_id=manifesto.id,
+        spam_signatures=spam_signatures
     )
     
     # AUTO-DELETE spam (spam_like) immediately
@@ -1195,7 +1232,6 @@ async def create_comment(comment: CommentCreate, db: Session = Depends(get_db)):
     new_comment = CommentModel(
         manifesto_id=comment.manifesto_id,
         parent_id=comment.parent_id,
-        nullifier_display='anonymous',  # Legacy field, kept for DB compatibility
         session_id=session_id,
         author_display=f"Citizen-{session_id[:6]}",
         content=comment.content,
@@ -1207,7 +1243,8 @@ async def create_comment(comment: CommentCreate, db: Session = Depends(get_db)):
         auto_flag_reason=analysis['auto_flag_reason'],
         similarity_score=analysis['similarity_score'],
         matched_promise_id=analysis['matched_promise_id'],
-        spam_similarity_score=analysis['spam_similarity_score']
+        spam_similarity_score=analysis['spam_similarity_score'],
+        content_minhash=analysis['content_minhash']
     )
     
     db.add(new_comment)
@@ -1573,23 +1610,23 @@ async def get_representatives(db: Session = Depends(get_db)):
     """Get list of all registered representatives."""
     representatives = db.query(Representative).all()
     
+    # Manifesto counts for every representative in one grouped query
+    # (representative_id -> (total, kept, broken)) instead of three per row
+    manifesto_counts = {
+        representative_id: (count, kept, broken)
+        for representative_id, count, kept, broken in db.query(
+            ManifestoModel.representative_id,
+            func.count(ManifestoModel.id),
+            func.count(ManifestoModel.id).filter(ManifestoModel.status == "kept"),
+            func.count(ManifestoModel.id).filter(ManifestoModel.status == "broken"),
+        ).group_by(ManifestoModel.representative_id)
+    }
+    
     result = []
     for r in representatives:
-        # Count manifestos
-        manifesto_count = db.query(func.count(ManifestoModel.id)).filter(
-            ManifestoModel.representative_id == r.id
-        ).scalar()
+        manifesto_count, kept, broken = manifesto_counts.get(r.id, (0, 0, 0))
         
         # Calculate integrity score based on kept vs broken
-        kept = db.query(func.count(ManifestoModel.id)).filter(
-            ManifestoModel.representative_id == r.id,
-            ManifestoModel.status == "kept"
-        ).scalar()
-        broken = db.query(func.count(ManifestoModel.id)).filter(
-            ManifestoModel.representative_id == r.id,
-            ManifestoModel.status == "broken"
-        ).scalar()
-        
         total = kept + broken
         integrity_score = round(kept / total * 100) if total > 0 else 50
         
@@ -1935,10 +1972,8 @@ async def generate_representative_wallet(
             "version": representative.key_version or 1
         })
         representative.previous_wallet_addresses = old_addresses
+        revoke_and_rotate_key(db, representative)
         representative.key_version = (representative.key_version or 1) + 1
-        representative.key_revoked = False
-        representative.key_revoked_at = None
-        representative.key_revoked_reason = None
     
     representative.wallet_address = address
     representative.public_key = public_key
@@ -2020,12 +2055,11 @@ async def rotate_representative_key(
     
     # Update representative
     representative.previous_wallet_addresses = old_addresses
+    revoke_and_rotate_key(db, representative, request.reason)
     representative.wallet_address = new_address
     representative.public_key = public_key
     representative.wallet_created_at = datetime.now(timezone.utc)
     representative.key_version = (representative.key_version or 1) + 1
-    representative.key_revoked = False
-    representative.key_revoked_at = None
     
     db.commit()
     
@@ -2374,7 +2408,7 @@ async def get_representative_wallet_status(representative_id: int, db: Session =
         "wallet_address_short": format_address_short(representative.wallet_address) if representative.wallet_address else None,
         "wallet_created_at": representative.wallet_created_at.isoformat() if representative.wallet_created_at else None,
         "key_version": representative.key_version if hasattr(representative, 'key_version') else 1,
-        "key_revoked": representative.key_revoked if hasattr(representative, 'key_revoked') else False,
+        "key_revoked": representative.key_revoked,
         "previous_keys_count": len(representative.previous_wallet_addresses or []) if hasattr(representative, 'previous_wallet_addresses') else 0
     }
 
@@ -0,0 +1,35 @@
+"""Index comments by (manifesto_id, created_at)
+
+Revision ID: comment_manifesto_index
+Revises: comment_minhash
+Create Date: 2026-01-08
+
+Changes:
+- Add ix_comments_manifesto_id_created_at. Comment listing, flagged
+  review and the spam-check window all filter on manifesto_id and order
+  by created_at DESC; without it each of them scans the whole table
+- Built CONCURRENTLY so comment posting isn't blocked on large tables
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'comment_manifesto_index'
+down_revision: Union[str, None] = 'comment_minhash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index('ix_comments_manifesto_id_created_at', 'comments',
+                        ['manifesto_id', 'created_at'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_comments_manifesto_id_created_at', table_name='comments',
+                      postgresql_concurrently=True)
@@ -0,0 +1,32 @@
+"""Add comments.content_minhash for MinHash spam detection
+
+Revision ID: comment_minhash
+Revises: representative_key_state
+Create Date: 2026-01-07
+
+Changes:
+- Add comments.content_minhash BYTEA: 128 one-byte minhashes of the
+  comment's character 5-grams, compared by byte equality to estimate
+  Jaccard similarity for near-duplicate (spam) detection
+- Existing rows stay NULL and are hashed on the fly when read for a
+  spam check (MinHash is computed in Python, so no SQL backfill)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'comment_minhash'
+down_revision: Union[str, None] = 'representative_key_state'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('comments', sa.Column('content_minhash', sa.LargeBinary(128), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('comments', 'content_minhash')
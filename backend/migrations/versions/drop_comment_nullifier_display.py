@@ -0,0 +1,38 @@
+"""Drop legacy comments.nullifier_display column
+
+Revision ID: drop_nullifier_display
+Revises: partition_manifesto_votes
+Create Date: 2026-01-06
+
+Changes:
+- Drop comments.nullifier_display (superseded by session_id/author_display
+  in add_comment_moderation_fields; every row held 'anonymous')
+- VACUUM FULL comments to give the dead column's space back
+
+NOTE: VACUUM FULL takes an ACCESS EXCLUSIVE lock on comments - run this
+upgrade in a maintenance window.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'drop_nullifier_display'
+down_revision: Union[str, None] = 'partition_manifesto_votes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_column('comments', 'nullifier_display')
+
+    # VACUUM cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("VACUUM FULL comments")
+
+
+def downgrade() -> None:
+    op.add_column('comments', sa.Column('nullifier_display', sa.String(20),
+                                        nullable=False, server_default='anonymous'))
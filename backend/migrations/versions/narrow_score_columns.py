@@ -0,0 +1,60 @@
+"""Narrow bounded integer columns to SMALLINT
+
+Revision ID: narrow_score_columns
+Revises: fix_zk_columns, add_comment_moderation_fields, add_politician_verification
+Create Date: 2026-01-05
+
+Changes:
+- comments.similarity_score and comments.spam_similarity_score are 0-100
+- voters.ward is a small ward number
+All three fit in a 2-byte SMALLINT instead of a 4-byte INTEGER.
+comments.upvotes/downvotes/flag_count stay INTEGER: they count one vote per
+verified voter, so they are bounded only by the voter registry size.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'narrow_score_columns'
+down_revision: Union[str, Sequence[str], None] = (
+    'fix_zk_columns', 'add_comment_moderation_fields', 'add_politician_verification'
+)
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('comments', 'similarity_score',
+                    existing_type=sa.Integer(),
+                    type_=sa.SmallInteger(),
+                    existing_nullable=True)
+
+    op.alter_column('comments', 'spam_similarity_score',
+                    existing_type=sa.Integer(),
+                    type_=sa.SmallInteger(),
+                    existing_nullable=True)
+
+    op.alter_column('voters', 'ward',
+                    existing_type=sa.Integer(),
+                    type_=sa.SmallInteger(),
+                    existing_nullable=True)
+
+
+def downgrade() -> None:
+    op.alter_column('voters', 'ward',
+                    existing_type=sa.SmallInteger(),
+                    type_=sa.Integer(),
+                    existing_nullable=True)
+
+    op.alter_column('comments', 'spam_similarity_score',
+                    existing_type=sa.SmallInteger(),
+                    type_=sa.Integer(),
+                    existing_nullable=True)
+
+    op.alter_column('comments', 'similarity_score',
+                    existing_type=sa.SmallInteger(),
+                    type_=sa.Integer(),
+                    existing_nullable=True)
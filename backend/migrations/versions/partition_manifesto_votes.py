@@ -0,0 +1,105 @@
+"""Hash-partition manifesto_votes by manifesto_id
+
+Revision ID: partition_manifesto_votes
+Revises: narrow_score_columns
+Create Date: 2026-01-05
+
+Changes:
+- manifesto_votes becomes a PARTITION BY HASH (manifesto_id) table with
+  8 child partitions; existing rows are copied across
+- Primary key widens to (id, manifesto_id) since Postgres requires the
+  partition key in every unique constraint
+- audit_logs is left unpartitioned: its manifesto_id is NULL for the
+  genesis block, so it cannot be part of the primary key
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'partition_manifesto_votes'
+down_revision: Union[str, None] = 'narrow_score_columns'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copied, not imported, from models.VOTE_PARTITIONS: this migration must keep
+# creating the same layout even if the model changes. Keep the two equal.
+VOTE_PARTITIONS = 8
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE manifesto_votes RENAME TO manifesto_votes_unpartitioned")
+    op.execute("ALTER INDEX IF EXISTS ix_manifesto_votes_nullifier RENAME TO ix_manifesto_votes_nullifier_old")
+    op.execute("""
+        ALTER TABLE manifesto_votes_unpartitioned
+        DROP CONSTRAINT IF EXISTS unique_vote_per_manifesto,
+        DROP CONSTRAINT IF EXISTS valid_vote_type
+    """)
+
+    op.execute("""
+        CREATE TABLE manifesto_votes (
+            id SERIAL NOT NULL,
+            manifesto_id INTEGER NOT NULL REFERENCES manifestos (id),
+            nullifier VARCHAR(128) NOT NULL,
+            vote_type VARCHAR(10) NOT NULL,
+            vote_hash VARCHAR(66),
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            PRIMARY KEY (id, manifesto_id),
+            CONSTRAINT unique_vote_per_manifesto UNIQUE (manifesto_id, nullifier),
+            CONSTRAINT valid_vote_type CHECK (vote_type IN ('kept', 'broken'))
+        ) PARTITION BY HASH (manifesto_id)
+    """)
+    for remainder in range(VOTE_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE manifesto_votes_p{remainder} PARTITION OF manifesto_votes "
+            f"FOR VALUES WITH (MODULUS {VOTE_PARTITIONS}, REMAINDER {remainder})"
+        )
+    op.execute("CREATE INDEX ix_manifesto_votes_nullifier ON manifesto_votes (nullifier)")
+
+    op.execute("""
+        INSERT INTO manifesto_votes (id, manifesto_id, nullifier, vote_type, vote_hash, created_at, updated_at)
+        SELECT id, manifesto_id, nullifier, vote_type, vote_hash, created_at, updated_at
+        FROM manifesto_votes_unpartitioned
+    """)
+    op.execute("""
+        SELECT setval(pg_get_serial_sequence('manifesto_votes', 'id'),
+                      COALESCE((SELECT MAX(id) FROM manifesto_votes), 0) + 1, false)
+    """)
+    op.execute("DROP TABLE manifesto_votes_unpartitioned")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE manifesto_votes RENAME TO manifesto_votes_partitioned")
+    op.execute("ALTER INDEX IF EXISTS ix_manifesto_votes_nullifier RENAME TO ix_manifesto_votes_nullifier_part")
+    op.execute("""
+        ALTER TABLE manifesto_votes_partitioned
+        DROP CONSTRAINT IF EXISTS unique_vote_per_manifesto,
+        DROP CONSTRAINT IF EXISTS valid_vote_type
+    """)
+
+    op.execute("""
+        CREATE TABLE manifesto_votes (
+            id SERIAL PRIMARY KEY,
+            manifesto_id INTEGER NOT NULL REFERENCES manifestos (id),
+            nullifier VARCHAR(128) NOT NULL,
+            vote_type VARCHAR(10) NOT NULL,
+            vote_hash VARCHAR(66),
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT unique_vote_per_manifesto UNIQUE (manifesto_id, nullifier),
+            CONSTRAINT valid_vote_type CHECK (vote_type IN ('kept', 'broken'))
+        )
+    """)
+    op.execute("CREATE INDEX ix_manifesto_votes_nullifier ON manifesto_votes (nullifier)")
+    op.execute("""
+        INSERT INTO manifesto_votes (id, manifesto_id, nullifier, vote_type, vote_hash, created_at, updated_at)
+        SELECT id, manifesto_id, nullifier, vote_type, vote_hash, created_at, updated_at
+        FROM manifesto_votes_partitioned
+    """)
+    op.execute("""
+        SELECT setval(pg_get_serial_sequence('manifesto_votes', 'id'),
+                      COALESCE((SELECT MAX(id) FROM manifesto_votes), 0) + 1, false)
+    """)
+    op.execute("DROP TABLE manifesto_votes_partitioned")
@@ -0,0 +1,96 @@
+"""Pack representative key revocation columns into key_state flags
+
+Revision ID: representative_key_state
+Revises: drop_nullifier_display
+Create Date: 2026-01-06
+
+Changes:
+- Add representatives.key_state SMALLINT bit flags:
+    1 = revoked (lost), 2 = revoked (compromised), 4 = revoked (other),
+    8 = rotated (current key replaced an earlier one)
+- Add representative_key_events for revocation/rotation timestamps and
+  reasons (only representatives with key history get rows)
+- Drop key_revoked, key_revoked_at, key_revoked_reason
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'representative_key_state'
+down_revision: Union[str, None] = 'drop_nullifier_display'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('representatives', sa.Column('key_state', sa.SmallInteger(),
+                                               nullable=False, server_default='0'))
+
+    op.create_table(
+        'representative_key_events',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('representative_id', sa.Integer(), nullable=False),
+        sa.Column('key_version', sa.Integer(), nullable=False),
+        sa.Column('key_state', sa.SmallInteger(), nullable=False),
+        sa.Column('wallet_address', sa.String(42), nullable=True),
+        sa.Column('reason', sa.String(255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['representative_id'], ['representatives.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_representative_key_events_representative_id',
+                    'representative_key_events', ['representative_id'])
+
+    # Backfill flags from the old columns
+    op.execute("""
+        UPDATE representatives
+        SET key_state =
+            CASE WHEN key_revoked THEN
+                CASE key_revoked_reason
+                    WHEN 'lost' THEN 1
+                    WHEN 'compromised' THEN 2
+                    ELSE 4
+                END
+            ELSE 0 END
+            | CASE WHEN COALESCE(key_version, 1) > 1 THEN 8 ELSE 0 END
+    """)
+    op.execute("""
+        INSERT INTO representative_key_events
+            (representative_id, key_version, key_state, wallet_address, reason, created_at)
+        SELECT id, COALESCE(key_version, 1), key_state, wallet_address,
+               key_revoked_reason, COALESCE(key_revoked_at, now())
+        FROM representatives
+        WHERE key_revoked
+    """)
+
+    op.drop_column('representatives', 'key_revoked_reason')
+    op.drop_column('representatives', 'key_revoked_at')
+    op.drop_column('representatives', 'key_revoked')
+
+
+def downgrade() -> None:
+    op.add_column('representatives', sa.Column('key_revoked', sa.Boolean(), nullable=True,
+                                               server_default='false'))
+    op.add_column('representatives', sa.Column('key_revoked_at', sa.DateTime(), nullable=True))
+    op.add_column('representatives', sa.Column('key_revoked_reason', sa.String(255), nullable=True))
+
+    op.execute("""
+        UPDATE representatives r
+        SET key_revoked = (r.key_state & 7) <> 0,
+            key_revoked_at = e.created_at,
+            key_revoked_reason = e.reason
+        FROM (
+            SELECT DISTINCT ON (representative_id) representative_id, created_at, reason
+            FROM representative_key_events
+            ORDER BY representative_id, created_at DESC
+        ) e
+        WHERE e.representative_id = r.id AND (r.key_state & 7) <> 0
+    """)
+
+    op.drop_index('ix_representative_key_events_representative_id',
+                  table_name='representative_key_events')
+    op.drop_table('representative_key_events')
+    op.drop_column('representatives', 'key_state')
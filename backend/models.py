@@ -10,14 +10,19 @@ Privacy Architecture:
 """
 
 from sqlalchemy import (
-    Column, Integer, String, Text, Boolean, DateTime, ForeignKey,
-    UniqueConstraint, Index, CheckConstraint
+    Integer, SmallInteger, String, LargeBinary, Text, Boolean, DateTime, ForeignKey,
+    UniqueConstraint, Index, CheckConstraint, DDL, event
 )
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
+from typing import List, Optional
 
-Base = declarative_base()
+
+class Base(DeclarativeBase):
+    """Declarative base - every attribute must be a typed Mapped[...] column."""
+    __allow_unmapped__ = False
 
 
 # =============================================================================
@@ -32,20 +37,20 @@ class Voter(Base):
     """
     __tablename__ = 'voters'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    voter_id = Column(String(50), unique=True, nullable=False, index=True)
-    name = Column(String(255), nullable=False)
-    age = Column(Integer, nullable=True)
-    gender = Column(String(20), nullable=True)
-    spouse_name = Column(String(255), nullable=True)
-    parent_name = Column(String(255), nullable=True)
-    province = Column(String(50), nullable=True)
-    district = Column(String(100), nullable=True)
-    vdc = Column(String(100), nullable=True)  # Village Development Committee / Municipality
-    ward = Column(Integer, nullable=True)
-    registration_center = Column(String(255), nullable=True)
-    merkle_leaf = Column(String(66), nullable=True)  # Keccak256 hash for Merkle tree
-    created_at = Column(DateTime, default=datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    voter_id: Mapped[str] = mapped_column(String(50), unique=True, nullable=False, index=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    age: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    gender: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    spouse_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    parent_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    province: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    district: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    vdc: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # Village Development Committee / Municipality
+    ward: Mapped[Optional[int]] = mapped_column(SmallInteger, nullable=True)
+    registration_center: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    merkle_leaf: Mapped[Optional[str]] = mapped_column(String(66), nullable=True)  # Keccak256 hash for Merkle tree
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
     
     def __repr__(self):
         return f"<Voter {self.voter_id}: {self.name}>"
@@ -62,11 +67,11 @@ class ZKCredential(Base):
     """
     __tablename__ = 'zk_credentials'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    nullifier_hash = Column(String(128), unique=True, nullable=False, index=True)  # ZK nullifiers can be ~78 chars
-    credential_hash = Column(String(128), nullable=False)
-    is_valid = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    nullifier_hash: Mapped[str] = mapped_column(String(128), unique=True, nullable=False, index=True)  # ZK nullifiers can be ~78 chars
+    credential_hash: Mapped[str] = mapped_column(String(128), nullable=False)
+    is_valid: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
     
     def __repr__(self):
         return f"<ZKCredential {self.nullifier_hash[:12]}...>"
@@ -76,6 +81,13 @@ class ZKCredential(Base):
 # REPRESENTATIVES
 # =============================================================================
 
+# Representative.key_state bit flags (0 = active key, never rotated)
+KEY_STATE_REVOKED_LOST = 1 << 0
+KEY_STATE_REVOKED_COMPROMISED = 1 << 1
+KEY_STATE_REVOKED_OTHER = 1 << 2
+KEY_STATE_ROTATED = 1 << 3  # Current key replaced an earlier one
+KEY_STATE_REVOKED = KEY_STATE_REVOKED_LOST | KEY_STATE_REVOKED_COMPROMISED | KEY_STATE_REVOKED_OTHER
+
 class Representative(Base):
     """
     Representatives who make promises. Will be seeded with sample data.
@@ -87,49 +99,80 @@ class Representative(Base):
     """
     __tablename__ = 'representatives'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    name = Column(String(255), nullable=False)
-    slug = Column(String(300), nullable=True, unique=True, index=True)  # URL-friendly version of name
-    party = Column(String(100), nullable=True)
-    position = Column(String(100), nullable=True)  # PM, Minister, MP, etc.
-    image_url = Column(String(500), nullable=True)
-    bio = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    slug: Mapped[Optional[str]] = mapped_column(String(300), nullable=True, unique=True, index=True)  # URL-friendly version of name
+    party: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    position: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # PM, Minister, MP, etc.
+    image_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    bio: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
     
     # ========= Citizen Verification (Required First) =========
-    citizen_nullifier = Column(String(128), unique=True, nullable=True, index=True)  # ZK credential linking to voter registry
-    citizen_voter_id = Column(String(50), nullable=True)  # Original voter ID (for audit, not displayed)
-    citizenship_verified_at = Column(DateTime, nullable=True)  # When they proved citizenship
+    citizen_nullifier: Mapped[Optional[str]] = mapped_column(String(128), unique=True, nullable=True, index=True)  # ZK credential linking to voter registry
+    citizen_voter_id: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)  # Original voter ID (for audit, not displayed)
+    citizenship_verified_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # When they proved citizenship
     
     # ========= Representative Verification Status =========
-    application_status = Column(String(20), default='pending')  # pending, approved, rejected
-    is_verified = Column(Boolean, default=False)  # True if approved by election commission
-    verified_by = Column(String(100), nullable=True)  # Admin/commission who verified
-    verified_at = Column(DateTime, nullable=True)  # When verification was approved
-    election_commission_id = Column(String(50), nullable=True)  # Official EC ID if available
-    rejection_reason = Column(Text, nullable=True)  # If rejected, why?
+    application_status: Mapped[Optional[str]] = mapped_column(String(20), default='pending')  # pending, approved, rejected
+    is_verified: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)  # True if approved by election commission
+    verified_by: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # Admin/commission who verified
+    verified_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # When verification was approved
+    election_commission_id: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)  # Official EC ID if available
+    rejection_reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # If rejected, why?
     
     # ========= Digital Identity (Wallet) =========
-    wallet_address = Column(String(42), unique=True, nullable=True)  # Ethereum address (0x...)
-    wallet_created_at = Column(DateTime, nullable=True)
-    public_key = Column(String(130), nullable=True)  # Full public key (for advanced verification)
+    wallet_address: Mapped[Optional[str]] = mapped_column(String(42), unique=True, nullable=True)  # Ethereum address (0x...)
+    wallet_created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    public_key: Mapped[Optional[str]] = mapped_column(String(130), nullable=True)  # Full public key (for advanced verification)
     
     # ========= Key Rotation Support =========
-    key_version = Column(Integer, default=1)  # Increments on key rotation
-    key_revoked = Column(Boolean, default=False)  # True if key has been revoked
-    key_revoked_at = Column(DateTime, nullable=True)
-    key_revoked_reason = Column(String(255), nullable=True)  # "lost", "compromised", etc.
+    key_version: Mapped[Optional[int]] = mapped_column(Integer, default=1)  # Increments on key rotation
+    key_state: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)  # KEY_STATE_* bit flags
     
     # Previous wallet addresses (for historical verification)
-    previous_wallet_addresses = Column(JSONB, default=list)  # List of {address, revoked_at, version}
+    previous_wallet_addresses: Mapped[Optional[list]] = mapped_column(JSONB, default=list)  # List of {address, revoked_at, version}
     
     # Relationships
-    manifestos = relationship("Manifesto", back_populates="representative")
+    manifestos: Mapped[List["Manifesto"]] = relationship(back_populates="representative")
+    key_events: Mapped[List["RepresentativeKeyEvent"]] = relationship(back_populates="representative", cascade="all, delete-orphan")
+    
+    @hybrid_property
+    def key_revoked(self) -> bool:
+        """True if the current key has been revoked (any reason)."""
+        return bool((self.key_state or 0) & KEY_STATE_REVOKED)
+    
+    @key_revoked.expression
+    def key_revoked(cls):
+        return cls.key_state.op('&')(KEY_STATE_REVOKED) != 0
     
     def __repr__(self):
         return f"<Representative {self.name} ({self.party})>"
 
 
+class RepresentativeKeyEvent(Base):
+    """
+    Key lifecycle events (revocations, rotations) for representatives.
+    Timestamps and reasons live here so the hot representatives row only
+    carries the compact key_state flags.
+    """
+    __tablename__ = 'representative_key_events'
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    representative_id: Mapped[int] = mapped_column(Integer, ForeignKey('representatives.id'), nullable=False, index=True)
+    key_version: Mapped[int] = mapped_column(Integer, nullable=False)  # Key version the event applies to
+    key_state: Mapped[int] = mapped_column(SmallInteger, nullable=False)  # key_state after the event
+    wallet_address: Mapped[Optional[str]] = mapped_column(String(42), nullable=True)  # Address the event applies to
+    reason: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)  # "lost", "compromised", "scheduled", etc.
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    representative: Mapped["Representative"] = relationship(back_populates="key_events")
+    
+    def __repr__(self):
+        return f"<RepresentativeKeyEvent {self.representative_id} v{self.key_version} state={self.key_state}>"
+
+
 # =============================================================================
 # MANIFESTOS (Promises)
 # =============================================================================
@@ -150,44 +193,44 @@ class Manifesto(Base):
     """
     __tablename__ = 'manifestos'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    representative_id = Column(Integer, ForeignKey('representatives.id'), nullable=False)
-    title = Column(String(500), nullable=False)
-    description = Column(Text, nullable=False)
-    category = Column(String(50), nullable=False)  # infrastructure, economy, education, etc.
-    status = Column(String(20), default='pending')  # pending, kept, broken
-    promise_hash = Column(String(66), nullable=True)  # SHA256 hash for blockchain
-    grace_period_end = Column(DateTime, nullable=False)  # When voting opens
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    representative_id: Mapped[int] = mapped_column(Integer, ForeignKey('representatives.id'), nullable=False)
+    title: Mapped[str] = mapped_column(String(500), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=False)
+    category: Mapped[str] = mapped_column(String(50), nullable=False)  # infrastructure, economy, education, etc.
+    status: Mapped[Optional[str]] = mapped_column(String(20), default='pending')  # pending, kept, broken
+    promise_hash: Mapped[Optional[str]] = mapped_column(String(66), nullable=True)  # SHA256 hash for blockchain
+    grace_period_end: Mapped[datetime] = mapped_column(DateTime, nullable=False)  # When voting opens
     
     # ========= Digital Signature Fields =========
-    signature = Column(Text, nullable=True)  # ECDSA signature (hex string)
-    signed_at = Column(DateTime, nullable=True)  # When signature was created
-    signer_address = Column(String(42), nullable=True)  # Address that signed (for key rotation)
-    signer_key_version = Column(Integer, nullable=True)  # Which key version was used
+    signature: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # ECDSA signature (hex string)
+    signed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # When signature was created
+    signer_address: Mapped[Optional[str]] = mapped_column(String(42), nullable=True)  # Address that signed (for key rotation)
+    signer_key_version: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # Which key version was used
     
     # ========= Blockchain Integration =========
-    blockchain_tx = Column(String(66), nullable=True)  # Transaction hash on blockchain
-    blockchain_confirmed = Column(Boolean, default=False)  # True if confirmed on-chain
-    blockchain_block = Column(Integer, nullable=True)  # Block number where recorded
+    blockchain_tx: Mapped[Optional[str]] = mapped_column(String(66), nullable=True)  # Transaction hash on blockchain
+    blockchain_confirmed: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)  # True if confirmed on-chain
+    blockchain_block: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # Block number where recorded
     
     # ========= Legacy Data Handling =========
-    legacy_unverified = Column(Boolean, default=False)  # True for pre-signature manifestos
+    legacy_unverified: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)  # True for pre-signature manifestos
     
     # Existing fields
-    vote_kept = Column(Integer, default=0)  # Cached aggregate
-    vote_broken = Column(Integer, default=0)  # Cached aggregate
-    created_at = Column(DateTime, default=datetime.utcnow)
+    vote_kept: Mapped[Optional[int]] = mapped_column(Integer, default=0)  # Cached aggregate
+    vote_broken: Mapped[Optional[int]] = mapped_column(Integer, default=0)  # Cached aggregate
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
     
     # Check constraint for status
     __table_args__ = (
-        CheckConstraint(status.in_(['pending', 'kept', 'broken']), name='valid_status'),
+        CheckConstraint("status IN ('pending', 'kept', 'broken')", name='valid_status'),
     )
     
     # Relationships
-    representative = relationship("Representative", back_populates="manifestos")
-    votes = relationship("ManifestoVote", back_populates="manifesto", cascade="all, delete-orphan")
-    comments = relationship("Comment", back_populates="manifesto", cascade="all, delete-orphan")
-    audit_logs = relationship("AuditLog", back_populates="manifesto", cascade="all, delete-orphan")
+    representative: Mapped["Representative"] = relationship(back_populates="manifestos")
+    votes: Mapped[List["ManifestoVote"]] = relationship(back_populates="manifesto", cascade="all, delete-orphan")
+    comments: Mapped[List["Comment"]] = relationship(back_populates="manifesto", cascade="all, delete-orphan")
+    audit_logs: Mapped[List["AuditLog"]] = relationship(back_populates="manifesto", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Manifesto {self.id}: {self.title[:50]}...>"
@@ -203,29 +246,53 @@ class ManifestoVote(Base):
     - Linked to nullifier (anonymous)
     - One vote per nullifier per manifesto (can change vote type)
     - vote_hash for Merkle proof verification
+    
+    Partitioning (PostgreSQL):
+    - HASH(manifesto_id) into VOTE_PARTITIONS child tables
+    - Per-manifesto reads/writes touch a single small partition
+    - manifesto_id is part of the primary key (required by Postgres)
     """
     __tablename__ = 'manifesto_votes'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    manifesto_id = Column(Integer, ForeignKey('manifestos.id'), nullable=False)
-    nullifier = Column(String(128), nullable=False, index=True)  # Anonymous voter ID
-    vote_type = Column(String(10), nullable=False)  # 'kept' or 'broken'
-    vote_hash = Column(String(66), nullable=True)  # For Merkle proof
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    manifesto_id: Mapped[int] = mapped_column(Integer, ForeignKey('manifestos.id'), primary_key=True)
+    nullifier: Mapped[str] = mapped_column(String(128), nullable=False, index=True)  # Anonymous voter ID
+    vote_type: Mapped[str] = mapped_column(String(10), nullable=False)  # 'kept' or 'broken'
+    vote_hash: Mapped[Optional[str]] = mapped_column(String(66), nullable=True)  # For Merkle proof
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     __table_args__ = (
         UniqueConstraint('manifesto_id', 'nullifier', name='unique_vote_per_manifesto'),
-        CheckConstraint(vote_type.in_(['kept', 'broken']), name='valid_vote_type'),
+        CheckConstraint("vote_type IN ('kept', 'broken')", name='valid_vote_type'),
+        {'postgresql_partition_by': 'HASH (manifesto_id)'},
     )
     
     # Relationships
-    manifesto = relationship("Manifesto", back_populates="votes")
+    manifesto: Mapped["Manifesto"] = relationship(back_populates="votes")
     
     def __repr__(self):
         return f"<ManifestoVote {self.nullifier[:12]}... -> {self.vote_type}>"
 
 
+# Must match VOTE_PARTITIONS in migrations/versions/partition_manifesto_votes.py;
+# changing it means a new migration that repartitions existing rows.
+VOTE_PARTITIONS = 8
+
+# A partitioned parent table cannot hold rows, so create the hash children
+# right after CREATE TABLE (PostgreSQL only - other dialects ignore this).
+for _remainder in range(VOTE_PARTITIONS):
+    event.listen(
+        ManifestoVote.__table__,
+        'after_create',
+        DDL(
+            f"CREATE TABLE IF NOT EXISTS manifesto_votes_p{_remainder} "
+            f"PARTITION OF manifesto_votes "
+            f"FOR VALUES WITH (MODULUS {VOTE_PARTITIONS}, REMAINDER {_remainder})"
+        ).execute_if(dialect='postgresql')
+    )
+
+
 # =============================================================================
 # COMMENTS (Discussion threads)
 # =============================================================================
@@ -252,45 +319,53 @@ class Comment(Base):
     """
     __tablename__ = 'comments'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    manifesto_id = Column(Integer, ForeignKey('manifestos.id'), nullable=False)
-    parent_id = Column(Integer, ForeignKey('comments.id'), nullable=True)  # NULL = top-level
-    
-    # === Legacy field for backward compatibility ===
-    nullifier_display = Column(String(20), nullable=False, default='anonymous')  # Kept for DB compatibility
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    manifesto_id: Mapped[int] = mapped_column(Integer, ForeignKey('manifestos.id'), nullable=False)
+    parent_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('comments.id'), nullable=True)  # NULL = top-level
     
     # === Identity (no nullifier required for posting) ===
-    session_id = Column(String(32), nullable=False)  # Random session identifier
-    author_display = Column(String(20), nullable=True)  # Display name: "Citizen-a1b2c3"
+    session_id: Mapped[str] = mapped_column(String(32), nullable=False)  # Random session identifier
+    author_display: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # Display name: "Citizen-a1b2c3"
     
     # === Content ===
-    content = Column(Text, nullable=False)
-    evidence_url = Column(String(500), nullable=True)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    evidence_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     
     # === Voting (cached aggregates) ===
-    upvotes = Column(Integer, default=0)
-    downvotes = Column(Integer, default=0)
-    flag_count = Column(Integer, default=0)  # Community flag reports
+    # Kept INTEGER (not SMALLINT like the 0-100 scores): each counts one
+    # CommentVote per verified voter, so they are bounded by the registry
+    # size, which can pass 32767 on a popular comment
+    upvotes: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    downvotes: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    flag_count: Mapped[Optional[int]] = mapped_column(Integer, default=0)  # Community flag reports
     
     # === Moderation State ===
-    state = Column(String(20), default='active')  # active, auto_flagged, community_flagged, quarantined, soft_deleted
-    auto_flag_reason = Column(String(20), nullable=True)  # off_topic, spam_like, low_relevance
+    state: Mapped[Optional[str]] = mapped_column(String(20), default='active')  # active, auto_flagged, community_flagged, quarantined, soft_deleted
+    auto_flag_reason: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # off_topic, spam_like, low_relevance
     
     # === Cosine Similarity Scores ===
-    similarity_score = Column(Integer, nullable=True)  # 0-100 (max similarity to any promise)
-    matched_promise_id = Column(Integer, nullable=True)  # ID of most similar promise
-    spam_similarity_score = Column(Integer, nullable=True)  # 0-100 (max similarity to recent comments)
+    similarity_score: Mapped[Optional[int]] = mapped_column(SmallInteger, nullable=True)  # 0-100 (max similarity to any promise)
+    matched_promise_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # ID of most similar promise
+    spam_similarity_score: Mapped[Optional[int]] = mapped_column(SmallInteger, nullable=True)  # 0-100 (max similarity to recent comments)
+    content_minhash: Mapped[Optional[bytes]] = mapped_column(LargeBinary(128), nullable=True)  # 128 x 8-bit MinHash of content char 5-grams (spam check); NULL = not computed yet
     
     # === Timestamps ===
-    is_deleted = Column(Boolean, default=False)  # Soft delete flag
-    delete_scheduled_at = Column(DateTime, nullable=True)  # When deletion was scheduled
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    is_deleted: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)  # Soft delete flag
+    delete_scheduled_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # When deletion was scheduled
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    manifesto = relationship("Manifesto", back_populates="comments")
-    parent = relationship("Comment", remote_side=[id], backref="replies")
-    comment_votes = relationship("CommentVote", back_populates="comment", cascade="all, delete-orphan")
+    manifesto: Mapped["Manifesto"] = relationship(back_populates="comments")
+    parent: Mapped[Optional["Comment"]] = relationship(remote_side=[id], back_populates="replies")
+    replies: Mapped[List["Comment"]] = relationship(back_populates="parent")
+    comment_votes: Mapped[List["CommentVote"]] = relationship(back_populates="comment", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Every comment read is "this manifesto's comments, newest first"
+        # (listing, flagged review, spam-check window)
+        Index('ix_comments_manifesto_id_created_at', 'manifesto_id', 'created_at'),
+    )
     
     def __repr__(self):
         return f"<Comment {self.id} by {self.author_display or self.session_id[:8]}>"
@@ -307,20 +382,20 @@ class CommentVote(Base):
     """
     __tablename__ = 'comment_votes'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    comment_id = Column(Integer, ForeignKey('comments.id'), nullable=False)
-    nullifier = Column(String(128), nullable=False, index=True)  # Anonymous voter
-    vote_type = Column(String(10), nullable=False)  # 'up' or 'down'
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    comment_id: Mapped[int] = mapped_column(Integer, ForeignKey('comments.id'), nullable=False)
+    nullifier: Mapped[str] = mapped_column(String(128), nullable=False, index=True)  # Anonymous voter
+    vote_type: Mapped[str] = mapped_column(String(10), nullable=False)  # 'up' or 'down'
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     __table_args__ = (
         UniqueConstraint('comment_id', 'nullifier', name='unique_vote_per_comment'),
-        CheckConstraint(vote_type.in_(['up', 'down']), name='valid_comment_vote_type'),
+        CheckConstraint("vote_type IN ('up', 'down')", name='valid_comment_vote_type'),
     )
     
     # Relationships
-    comment = relationship("Comment", back_populates="comment_votes")
+    comment: Mapped["Comment"] = relationship(back_populates="comment_votes")
     
     def __repr__(self):
         return f"<CommentVote {self.nullifier[:12]}... -> {self.vote_type}>"
@@ -337,16 +412,16 @@ class AuditLog(Base):
     """
     __tablename__ = 'audit_logs'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)  # Block number
-    manifesto_id = Column(Integer, ForeignKey('manifestos.id'), nullable=True)
-    action = Column(String(50), nullable=False)  # PROMISE_CREATED, VOTE_AGGREGATED, STATUS_CHANGED
-    block_hash = Column(String(66), nullable=False)
-    prev_hash = Column(String(66), nullable=False)
-    data = Column(JSONB, nullable=True)  # Block data as JSON
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)  # Block number
+    manifesto_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('manifestos.id'), nullable=True)
+    action: Mapped[str] = mapped_column(String(50), nullable=False)  # PROMISE_CREATED, VOTE_AGGREGATED, STATUS_CHANGED
+    block_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+    prev_hash: Mapped[str] = mapped_column(String(66), nullable=False)
+    data: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)  # Block data as JSON
+    timestamp: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    manifesto = relationship("Manifesto", back_populates="audit_logs")
+    manifesto: Mapped[Optional["Manifesto"]] = relationship(back_populates="audit_logs")
     
     def __repr__(self):
         return f"<AuditLog Block {self.id}: {self.action}>"
@@ -363,11 +438,11 @@ class MerkleRoot(Base):
     """
     __tablename__ = 'merkle_roots'
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    root_hash = Column(String(66), nullable=False, unique=True)
-    leaf_count = Column(Integer, nullable=False)
-    tree_type = Column(String(50), nullable=False)  # 'voters' or 'votes'
-    created_at = Column(DateTime, default=datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    root_hash: Mapped[str] = mapped_column(String(66), nullable=False, unique=True)
+    leaf_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    tree_type: Mapped[str] = mapped_column(String(50), nullable=False)  # 'voters' or 'votes'
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
     
     def __repr__(self):
         return f"<MerkleRoot {self.root_hash[:12]}... ({self.leaf_count} leaves)>"
@@ -5,159 +5,118 @@ Seeds initial data for representatives and sample manifestos.
 """
 
 from datetime import datetime, timedelta
-import hashlib
+from hashlib import sha256  # OpenSSL-backed (_hashlib.openssl_sha256)
+import itertools
+import os
 import re
+import orjson
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 
 from database import get_db_context, init_db
-from models import Representative, Manifesto, AuditLog, ManifestoVote, Comment, CommentVote
+from models import (
+    Representative, RepresentativeKeyEvent, Manifesto, AuditLog,
+    ManifestoVote, Comment, CommentVote
+)
 # Import crypto utils
-from crypto_utils import generate_key_pair, create_signature, compute_manifesto_hash
+from crypto_utils import (
+    generate_key_pair, create_signature, compute_manifesto_hash, generate_block_hash, load_signing_key
+)
+
+_SLUG_STRIP = re.compile(r'[^\w\s-]')
+_SLUG_DASH = re.compile(r'[-\s]+')
 
 def generate_slug(name: str) -> str:
     """Generate URL-friendly slug from representative name."""
-    slug = name.lower()
-    slug = re.sub(r'[^\w\s-]', '', slug)
-    slug = re.sub(r'[-\s]+', '-', slug)
-    return slug.strip('-')
+    return _SLUG_DASH.sub('-', _SLUG_STRIP.sub('', name.lower())).strip('-')
 
-def generate_block_hash(data: str, prev_hash: str) -> str:
-    """Generate a block hash for audit trail."""
-    combined = f"{data}:{prev_hash}".encode('utf-8')
-    return '0x' + hashlib.sha256(combined).hexdigest()
+# Per-process random prefix + counter: every fake tx hash is unique, even for
+# calls landing in the same microsecond (the old utcnow()-based hash collided)
+_FAKE_TX_SEED = os.urandom(16)
+_fake_tx_counter = itertools.count(1)
 
 def generate_fake_tx_hash() -> str:
     """Generate a fake blockchain transaction hash."""
-    return '0x' + hashlib.sha256(datetime.utcnow().isoformat().encode()).hexdigest()
+    return '0x' + sha256(_FAKE_TX_SEED + next(_fake_tx_counter).to_bytes(8, 'little')).hexdigest()
 
 # =============================================================================
 # SAMPLE REPRESENTATIVES DATA (Generic Names)
 # =============================================================================
 
-REPRESENTATIVES = [
-    {
-        "name": "Ram Bahadur Thapa",
-        "party": "Democratic Party",
-        "position": "Senior Leader",
-        "image_url": "https://randomuser.me/api/portraits/men/1.jpg",
-        "bio": "A dedicated public servant with 20 years of experience in local governance."
-    },
-    {
-        "name": "Priya Patel",
-        "party": "Progressive Alliance",
-        "position": "Representative",
-        "image_url": "https://randomuser.me/api/portraits/women/2.jpg",
-        "bio": "Advocate for education reform and digital literacy in rural communities."
-    },
-    {
-        "name": "Amit Verma",
-        "party": "National Development Party",
-        "position": "General Secretary",
-        "image_url": "https://randomuser.me/api/portraits/men/3.jpg",
-        "bio": "Economist turned politician, focused on sustainable infrastructure development."
-    },
-    {
-        "name": "Sita Devi Sharma",
-        "party": "Social Justice Party",
-        "position": "Chairperson",
-        "image_url": "https://randomuser.me/api/portraits/women/4.jpg",
-        "bio": "Champion of women's rights and healthcare access for all citizens."
-    },
-    {
-        "name": "Hari Krishna Shrestha",
-        "party": "Unified People's Party",
-        "position": "Spokesperson",
-        "image_url": "https://randomuser.me/api/portraits/men/5.jpg",
-        "bio": "Former journalist committed to transparency and anti-corruption measures."
-    }
-]
+_REP_COLS = ("name", "party", "position", "image_url", "bio")
+
+REPRESENTATIVES = (
+    ("Ram Bahadur Thapa", "Democratic Party", "Senior Leader",
+     "https://randomuser.me/api/portraits/men/1.jpg",
+     "A dedicated public servant with 20 years of experience in local governance."),
+    ("Priya Patel", "Progressive Alliance", "Representative",
+     "https://randomuser.me/api/portraits/women/2.jpg",
+     "Advocate for education reform and digital literacy in rural communities."),
+    ("Amit Verma", "National Development Party", "General Secretary",
+     "https://randomuser.me/api/portraits/men/3.jpg",
+     "Economist turned politician, focused on sustainable infrastructure development."),
+    ("Sita Devi Sharma", "Social Justice Party", "Chairperson",
+     "https://randomuser.me/api/portraits/women/4.jpg",
+     "Champion of women's rights and healthcare access for all citizens."),
+    ("Hari Krishna Shrestha", "Unified People's Party", "Spokesperson",
+     "https://randomuser.me/api/portraits/men/5.jpg",
+     "Former journalist committed to transparency and anti-corruption measures."),
+)
 
 # =============================================================================
 # SAMPLE MANIFESTOS DATA
 # =============================================================================
 
+# (representative_index, title, description, category, status,
+#  grace_period_end offset in days from now, vote_kept, vote_broken)
+_MANIFESTO_TEMPLATE = (
+    # PENDING - Future
+    (0, "Road Expansion Project",  # Ram Bahadur Thapa
+     "Expand the main highway connecting rural districts to the capital to 4 lanes. This project aims to reduce travel time by 50% and boost local trade.",
+     "infrastructure", "pending", 180, 0, 0),
+    (1, "Digital Classrooms Initiative",  # Priya Patel
+     "Equip 500 government schools with smart classrooms and high-speed internet effectively bridging the digital divide.",
+     "education", "pending", 365, 0, 0),
+    (2, "Green Energy Subsidy",  # Amit Verma
+     "Provide 50% subsidy on solar panel installation for 10,000 households to promote renewable energy usage.",
+     "environment", "pending", 90, 0, 0),
+    
+    # PENDING - Voting Open
+    (3, "Community Health Centers",  # Sita Devi Sharma
+     "Establish fully staffed 24/7 health centers in every ward of the constituency.",
+     "healthcare", "pending", -30, 245, 89),
+    (4, "Zero Tolerance on Bribery",  # Hari Krishna Shrestha
+     "Implement a fully digital tracking system for all government services to eliminate bribery.",
+     "governance", "pending", -60, 567, 234),
+    
+    # KEPT
+    (1, "Girls Scholarship Program",  # Priya Patel
+     "Provided full scholarships to 1,000 underprivileged girls for higher secondary education.",
+     "education", "kept", -400, 2500, 150),
+    
+    # BROKEN
+    (2, "Free Public Wi-Fi",  # Amit Verma
+     "Promise to provide free Wi-Fi in all public parks was not fulfilled due to budget constraints.",
+     "infrastructure", "broken", -500, 400, 3200),
+)
+
 def get_manifestos_data() -> list:
     """Get manifestos with dynamic dates based on current time."""
     now = datetime.utcnow()
     
     return [
-        # PENDING - Future
-        {
-            "representative_index": 0, # Ram Bahadur Thapa
-            "title": "Road Expansion Project",
-            "description": "Expand the main highway connecting rural districts to the capital to 4 lanes. This project aims to reduce travel time by 50% and boost local trade.",
-            "category": "infrastructure",
-            "status": "pending",
-            "grace_period_end": now + timedelta(days=180),
-            "vote_kept": 0,
-            "vote_broken": 0
-        },
-        {
-            "representative_index": 1, # Priya Patel
-            "title": "Digital Classrooms Initiative",
-            "description": "Equip 500 government schools with smart classrooms and high-speed internet effectively bridging the digital divide.",
-            "category": "education",
-            "status": "pending",
-            "grace_period_end": now + timedelta(days=365),
-            "vote_kept": 0,
-            "vote_broken": 0
-        },
-        {
-            "representative_index": 2, # Amit Verma
-            "title": "Green Energy Subsidy",
-            "description": "Provide 50% subsidy on solar panel installation for 10,000 households to promote renewable energy usage.",
-            "category": "environment",
-            "status": "pending",
-            "grace_period_end": now + timedelta(days=90),
-            "vote_kept": 0,
-            "vote_broken": 0
-        },
-        
-        # PENDING - Voting Open
         {
-            "representative_index": 3, # Sita Devi Sharma
-            "title": "Community Health Centers",
-            "description": "Establish fully staffed 24/7 health centers in every ward of the constituency.",
-            "category": "healthcare",
-            "status": "pending",
-            "grace_period_end": now - timedelta(days=30),
-            "vote_kept": 245,
-            "vote_broken": 89
-        },
-        {
-            "representative_index": 4, # Hari Krishna Shrestha
-            "title": "Zero Tolerance on Bribery",
-            "description": "Implement a fully digital tracking system for all government services to eliminate bribery.",
-            "category": "governance",
-            "status": "pending",
-            "grace_period_end": now - timedelta(days=60),
-            "vote_kept": 567,
-            "vote_broken": 234
-        },
-        
-        # KEPT
-        {
-            "representative_index": 1, # Priya Patel
-            "title": "Girls Scholarship Program",
-            "description": "Provided full scholarships to 1,000 underprivileged girls for higher secondary education.",
-            "category": "education",
-            "status": "kept",
-            "grace_period_end": now - timedelta(days=400),
-            "vote_kept": 2500,
-            "vote_broken": 150
-        },
-        
-        # BROKEN
-        {
-            "representative_index": 2, # Amit Verma
-            "title": "Free Public Wi-Fi",
-            "description": "Promise to provide free Wi-Fi in all public parks was not fulfilled due to budget constraints.",
-            "category": "infrastructure",
-            "status": "broken",
-            "grace_period_end": now - timedelta(days=500),
-            "vote_kept": 400,
-            "vote_broken": 3200
+            "representative_index": rep_idx,
+            "title": title,
+            "description": description,
+            "category": category,
+            "status": status,
+            "grace_period_end": now + timedelta(days=days),
+            "vote_kept": vote_kept,
+            "vote_broken": vote_broken
         }
+        for rep_idx, title, description, category, status, days, vote_kept, vote_broken
+        in _MANIFESTO_TEMPLATE
     ]
 
 # =============================================================================
@@ -167,143 +126,180 @@ def get_manifestos_data() -> list:
 def seed_representatives(db: Session) -> list[dict]:
     """
     Seed representatives and generate key pairs.
-    Returns list of dicts with model and private_key.
+    Returns list of dicts with model, private_key and parsed signer key.
     """
     print("\n📥 Seeding representatives...")
     
     reps_with_keys = []
     
-    for data in REPRESENTATIVES:
+    for row in REPRESENTATIVES:
         # Generate crypto keys
         private_key, public_key, address = generate_key_pair()
         
-        data_model = data.copy()
-        data_model['slug'] = generate_slug(data['name'])
+        data_model = dict(zip(_REP_COLS, row))
+        data_model['slug'] = generate_slug(data_model['name'])
         data_model['wallet_address'] = address
         data_model['public_key'] = public_key
         data_model['is_verified'] = True
         
-        representative = Representative(**data_model)
-        db.add(representative)
-        db.flush() # get ID
-        
         reps_with_keys.append({
-            "model": representative,
-            "private_key": private_key
+            "model": Representative(**data_model),
+            "private_key": private_key,
+            "signer": load_signing_key(private_key)  # parsed once, reused per manifesto
         })
     
+    # One flush for the whole batch - manifestos need the ids as FKs
+    db.add_all([rep["model"] for rep in reps_with_keys])
+    db.flush()
+    
     print(f"  ✓ Created {len(reps_with_keys)} representatives with wallets")
     return reps_with_keys
 
-def seed_manifestos(db: Session, reps_with_keys: list[dict]) -> list[Manifesto]:
-    """Seed manifestos and sign them."""
+def seed_manifestos(db: Session, reps_with_keys: list[dict]) -> list[dict]:
+    """
+    Seed manifestos and sign them.
+    Rows are built as plain dicts and written with one multi-row INSERT.
+    Returns the inserted rows, each with its new "id".
+    """
     print("\n📥 Seeding manifestos...")
     
-    manifestos = []
+    rows = []
+    signed_at = datetime.utcnow()
     
-    for data in get_manifestos_data():
+    for i, data in enumerate(get_manifestos_data()):
         # Get representative and keys
         rep_idx = data.pop("representative_index")
         rep_info = reps_with_keys[rep_idx]
         rep_model = rep_info["model"]
-        private_key = rep_info["private_key"]
+        signer = rep_info["signer"]
         
-        # Create base manifesto
-        manifesto = Manifesto(**data)
-        manifesto.representative_id = rep_model.id
+        row = dict(data, representative_id=rep_model.id)
         
-        # Generate promise hash (hash of details)
-        # Using simple concatenation for checking, but robust applications might use structured data
-        manifesto_text = f"{manifesto.title}:{manifesto.description}:{manifesto.representative_id}"
-        manifesto.promise_hash = compute_manifesto_hash(manifesto_text)
+        # Generate promise hash of "title:description:representative_id"
+        # (streamed into the hasher - no joined copy of the description)
+        row["promise_hash"] = compute_manifesto_hash(
+            row["title"], b":", row["description"], b":", str(row["representative_id"])
+        )
         
         # Sign the promise hash
         # We sign the hash effectively saying "I authorize this content hash"
-        signature = create_signature(manifesto.promise_hash, private_key)
-        
-        manifesto.signature = signature
-        manifesto.signer_address = rep_model.wallet_address
-        manifesto.signed_at = datetime.utcnow()
+        row["signature"] = create_signature(row["promise_hash"], signer)
+        row["signer_address"] = rep_model.wallet_address
+        row["signed_at"] = signed_at
         
         # Fake Blockchain confirmation
-        manifesto.blockchain_tx = generate_fake_tx_hash()
-        manifesto.blockchain_block = 12345 + len(manifestos)
-        manifesto.blockchain_confirmed = True
+        row["blockchain_tx"] = generate_fake_tx_hash()
+        row["blockchain_block"] = 12345 + i
+        row["blockchain_confirmed"] = True
         
-        db.add(manifesto)
-        manifestos.append(manifesto)
+        rows.append(row)
     
-    db.flush()
-    print(f"  ✓ Created {len(manifestos)} signed manifestos")
-    return manifestos
+    # Bulk INSERT ... RETURNING id - ids come back in parameter order in the
+    # same round trip, so no flush or ORM objects are needed for the FKs
+    ids = db.scalars(
+        insert(Manifesto).returning(Manifesto.id, sort_by_parameter_order=True),
+        rows
+    ).all()
+    for manifesto_id, row in zip(ids, rows):
+        row["id"] = manifesto_id
+    print(f"  ✓ Created {len(rows)} signed manifestos")
+    return rows
 
-def seed_audit_logs(db: Session, manifestos: list[Manifesto]):
-    """Create audit logs with full verification data."""
-    print("\n📥 Seeding audit trail...")
+def build_audit_chain(manifestos: list[dict]) -> list[dict]:
+    """
+    Build audit log rows (genesis + one block per manifesto) with their hash chain.
+    Pure Python - no database access, so hashing never waits on a round trip.
     
-    # Genesis block
-    genesis = AuditLog(
-        manifesto_id=None,
-        action="GENESIS_BLOCK",
-        block_hash=generate_block_hash("GENESIS", "0x0"),
-        prev_hash="0x0000000000000000000000000000000000000000000000000000000000000000",
-        data={"message": "PromiseThread Genesis Block", "timestamp": datetime.utcnow().isoformat()}
-    )
-    db.add(genesis)
-    db.flush()
+    Hashing stays on hashlib for any N: every block hashes the previous
+    block's digest, so the chain is inherently serial, and OpenSSL's
+    (SHA-NI accelerated) sha256 beats a hand-written JIT SHA-256 per call.
+    """
+    # One timestamp for the whole run - the rows are created together
+    now_iso = datetime.utcnow().isoformat()
     
-    prev_hash = genesis.block_hash
+    # Genesis block
+    prev_hash = generate_block_hash("GENESIS", "0x0")
+    rows = [{
+        "manifesto_id": None,
+        "action": "GENESIS_BLOCK",
+        "block_hash": prev_hash,
+        "prev_hash": "0x0000000000000000000000000000000000000000000000000000000000000000",
+        "data": {"message": "PromiseThread Genesis Block", "timestamp": now_iso}
+    }]
     
     for manifesto in manifestos:
         # Full data dump matching API enhanced structure
         block_data = {
-            "manifesto_id": manifesto.id,
-            "title": manifesto.title,
-            "description": manifesto.description,
-            "representative_id": manifesto.representative_id,
-            "promise_hash": manifesto.promise_hash,
-            "status": manifesto.status,
+            "manifesto_id": manifesto["id"],
+            "title": manifesto["title"],
+            "description": manifesto["description"],
+            "representative_id": manifesto["representative_id"],
+            "promise_hash": manifesto["promise_hash"],
+            "status": manifesto["status"],
             
             # Verification Data
-            "signature": manifesto.signature,
-            "signer_address": manifesto.signer_address,
+            "signature": manifesto["signature"],
+            "signer_address": manifesto["signer_address"],
             "signature_verified": True,
             
-            "blockchain_tx": manifesto.blockchain_tx,
-            "blockchain_block": manifesto.blockchain_block,
+            "blockchain_tx": manifesto["blockchain_tx"],
+            "blockchain_block": manifesto["blockchain_block"],
             "blockchain_confirmed": True,
             
-            "timestamp": manifesto.created_at.isoformat() if manifesto.created_at else datetime.utcnow().isoformat()
+            "timestamp": manifesto["created_at"].isoformat() if manifesto.get("created_at") else now_iso
         }
         
         # Action type
         action_type = "PROMISE_CREATED"
-        if manifesto.signature:
+        if manifesto["signature"]:
             action_type = "SIGNED_MANIFESTO_CREATED"
-            
-        audit = AuditLog(
-            manifesto_id=manifesto.id,
-            action=action_type,
-            block_hash=generate_block_hash(str(manifesto.id), prev_hash),
-            prev_hash=prev_hash,
-            data=block_data
-        )
-        db.add(audit)
-        db.flush()
-        prev_hash = audit.block_hash
         
-    print(f"  ✓ Created {len(manifestos) + 1} audit logs")
+        # Same block hash input as the API's appends (the manifesto id), so
+        # seeded and live blocks verify by one rule
+        block_hash = generate_block_hash(str(manifesto["id"]), prev_hash)
+        # Serialized once and bound to the data column as an orjson.Fragment -
+        # database.json_serializer writes it out without re-serializing.
+        data_bytes = orjson.dumps(block_data, option=orjson.OPT_SORT_KEYS)
+        rows.append({
+            "manifesto_id": manifesto["id"],
+            "action": action_type,
+            "block_hash": block_hash,
+            "prev_hash": prev_hash,
+            "data": orjson.Fragment(data_bytes)
+        })
+        prev_hash = block_hash
+    
+    return rows
+
+def seed_audit_logs(db: Session, manifestos: list[dict]):
+    """Create audit logs with full verification data."""
+    print("\n📥 Seeding audit trail...")
+    
+    # Phase 1: compute the whole chain; phase 2: one bulk INSERT.
+    # Audit logs are write-only here, so go straight to the Core table and
+    # skip the ORM bulk-insert layer entirely.
+    rows = build_audit_chain(manifestos)
+    db.execute(insert(AuditLog.__table__), rows)
+    print(f"  ✓ Created {len(rows)} audit logs")
 
 def clear_seed_data(db: Session):
-    """Clear all seeded data."""
-    # Delete in correct order to handle Foreign Keys
-    db.query(AuditLog).delete()
-    db.query(CommentVote).delete()
-    db.query(Comment).delete()
-    db.query(ManifestoVote).delete()
-    db.query(Manifesto).delete()
-    db.query(Representative).delete()
-    db.commit()
+    """Clear all seeded data (caller commits)."""
+    if db.get_bind().dialect.name == "postgresql":
+        # One statement, no per-row work; also resets the id sequences
+        db.execute(text(
+            "TRUNCATE TABLE audit_logs, comment_votes, comments, manifesto_votes, "
+            "manifestos, representative_key_events, representatives "
+            "RESTART IDENTITY CASCADE"
+        ))
+    else:
+        # Delete in correct order to handle Foreign Keys
+        db.query(AuditLog).delete()
+        db.query(CommentVote).delete()
+        db.query(Comment).delete()
+        db.query(ManifestoVote).delete()
+        db.query(Manifesto).delete()
+        db.query(RepresentativeKeyEvent).delete()
+        db.query(Representative).delete()
     print("  ✓ Cleared existing seed data")
 
 def main():
@@ -314,6 +310,8 @@ def main():
     
     init_db()
     
+    # One transaction for clear + seed: get_db_context commits once on exit
+    # (or rolls everything back), so no partial seed is ever visible
     with get_db_context() as db:
         # Always clear old data to ensure consistent crypto linkage
         clear_seed_data(db)
@@ -323,8 +321,6 @@ def main():
         manifestos = seed_manifestos(db, reps_info)
         seed_audit_logs(db, manifestos)
         
-        db.commit()
-        
         print("\n" + "=" * 60)
         print("  SEEDING COMPLETE")
         print("=" * 60)
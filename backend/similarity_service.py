@@ -16,11 +16,136 @@ Thresholds (configurable):
 - spam_sim > 92    → quarantined (spam_like)
 """
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.base import clone
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
 import numpy as np
+from collections import Counter
+from functools import lru_cache
+from hashlib import blake2b
 from typing import List, Tuple, Optional, Dict
+import logging
+import math
 import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+_URL_RE = re.compile(r'http\S+|www\S+')
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+# Every ASCII character _NON_WORD_RE would replace (punctuation and control
+# characters) -> space, so ASCII text needs no regex pass
+_PUNCT_TABLE = str.maketrans({c: ' ' for c in map(chr, range(128)) if _NON_WORD_RE.match(c)})
+# Slack when truncating float32 cosines to whole percents, so identical
+# texts (cosine 0.99999994) still score 100
+_SCORE_EPS = 1e-4
+
+# MinHash (spam near-duplicate detection). The permutation parameters are
+# fixed so signatures stored in the database stay comparable across processes.
+SHINGLE_SIZE = 5
+MINHASH_PERMUTATIONS = 128
+_MINHASH_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_minhash_rng = np.random.default_rng(20250105)
+_MINHASH_A = _minhash_rng.integers(1, 1 << 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_MINHASH_B = _minhash_rng.integers(0, 1 << 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+PREPROCESS_CACHE_SIZE = 4096  # Manifesto/promise and recent-comment texts repeat across calls
+
+
+@lru_cache(maxsize=PREPROCESS_CACHE_SIZE)
+def _preprocess_text(text: str) -> str:
+    """Clean and normalize text for comparison."""
+    # Lowercase
+    text = text.lower()
+    # Remove URLs
+    text = _URL_RE.sub('', text)
+    # Remove special characters but keep spaces (table lookup for ASCII;
+    # the regex only runs when there may be Unicode punctuation, e.g. "।")
+    text = text.translate(_PUNCT_TABLE)
+    if not text.isascii():
+        text = _NON_WORD_RE.sub(' ', text)
+    # Normalize whitespace
+    return ' '.join(text.split())
+
+
+class CorpusIndex:
+    """
+    TF-IDF index over a fixed set of (preprocessed) documents, e.g. one
+    manifesto and its promises. The vocabulary is fitted once; each query
+    is a single count transform plus a few sparse products.
+    Scores match fitting TF-IDF on documents + query for every call (the
+    thresholds were tuned on that scale): the query only shifts the IDF of
+    the terms it contains, so both IDF variants are precomputed per term.
+    Read-only after construction, so one index can serve concurrent
+    requests without locking.
+    """
+    
+    def __init__(self, vectorizer: TfidfVectorizer, documents: List[str], positions: List[int]):
+        self.positions = positions  # index of each document in the caller's list
+        self.vectorizer = vectorizer.fit(documents)
+        self.vocabulary = self.vectorizer.vocabulary_
+        self.analyzer = self.vectorizer.build_analyzer()
+        # Raw term counts (TfidfVectorizer is a CountVectorizer underneath),
+        # in the template's float32 dtype - everything below stays float32
+        counts = CountVectorizer.transform(self.vectorizer, documents)
+        n = len(documents)
+        df = np.bincount(counts.indices, minlength=len(self.vocabulary))
+        # Smoothed IDF over the n documents plus the query, for a term the
+        # query lacks (absent_idf) or contains (query_idf)
+        absent_idf = (np.log((n + 2) / (df + 1)) + 1).astype(counts.dtype)
+        query_idf = (np.log((n + 2) / (df + 2)) + 1).astype(counts.dtype)
+        self.query_idf_sq = query_idf ** 2
+        # A query-only term: df=1 out of n+1 docs. Such terms add to the query
+        # norm, so extra off-topic words still lower the score.
+        self.oov_idf = math.log((n + 2) / 2) + 1
+        # Inverted indexes, stored term-major - row t is the (doc, value)
+        # posting list of term t, so a sparse query @ postings product only
+        # visits the postings of terms the query contains:
+        # - postings: count * idf**2 (the query supplies its own count)
+        # - norm_delta: change to a document's squared norm when the query
+        #   contains the term
+        sq_counts = counts.multiply(counts)
+        self.postings = counts.multiply(self.query_idf_sq).T.tocsr()
+        self.norm_delta = sq_counts.multiply(self.query_idf_sq - absent_idf ** 2).T.tocsr()
+        self.doc_norm_sq = np.asarray(sq_counts @ (absent_idf ** 2)).ravel()
+    
+    def max_similarity(self, query: str) -> Tuple[int, int]:
+        """
+        Cosine similarity of a preprocessed query against every document.
+        Returns: (max_similarity_score 0-100, caller index of best match)
+        """
+        return self.max_similarities([query])[0]
+    
+    def max_similarities(self, queries: List[str]) -> List[Tuple[int, int]]:
+        """
+        Batched max_similarity: one transform for all (preprocessed) queries
+        and a single (queries x documents) sparse product.
+        Returns: [(max_similarity_score 0-100, caller index of best match), ...]
+        """
+        query_counts = CountVectorizer.transform(self.vectorizer, queries)
+        norm_sq = np.asarray(query_counts.multiply(query_counts) @ self.query_idf_sq).ravel()
+        for row, query in enumerate(queries):
+            oov_counts = Counter(t for t in self.analyzer(query) if t not in self.vocabulary)
+            norm_sq[row] += sum((count * self.oov_idf) ** 2 for count in oov_counts.values())
+        # Query norms for the whole batch at once
+        norms = np.sqrt(norm_sq)
+        
+        # Sparse results: only documents sharing a term with the query get an entry
+        dots = query_counts @ self.postings
+        doc_norm_sq = ((query_counts > 0).astype(query_counts.dtype) @ self.norm_delta).tocsr()
+        doc_norm_sq.data += self.doc_norm_sq[doc_norm_sq.indices]
+        cosines = dots.multiply(doc_norm_sq.power(-0.5)).tocsr()
+        cosines.sort_indices()  # ties resolve to the earliest document
+        results = []
+        for row in range(len(queries)):
+            start, end = cosines.indptr[row], cosines.indptr[row + 1]
+            if norms[row] == 0 or start == end:
+                results.append((0, self.positions[0]))
+                continue
+            best = start + int(np.argmax(cosines.data[start:end]))
+            score = cosines.data[best] / norms[row]
+            results.append((int(score * 100 + _SCORE_EPS), self.positions[cosines.indices[best]]))
+        return results
 
 
 class SimilarityService:
@@ -34,37 +159,67 @@ class SimilarityService:
     RELEVANCE_MEDIUM = 40    # Below this = low_relevance
     SPAM_THRESHOLD = 92      # Above this = spam_like
     
-    def __init__(self):
+    MANIFESTO_INDEX_CACHE_SIZE = 256  # Fitted manifesto indexes kept in memory
+    MINHASH_SCAN_BLOCK = 1024  # Stored signatures compared per step in the spam scan
+    
+    def __init__(self, use_char_ngrams: bool = False):
+        """
+        use_char_ngrams: hash character 3-5-grams (within word boundaries)
+        instead of word 1-2-grams for pairwise compute_similarity - more
+        tolerant of typos and inflections, at a higher tokenization cost.
+        """
+        # Unfitted template - only ever clone()d (fit_corpus), never fitted
+        # itself, so request threads never mutate shared vectorizer state.
         # Use simpler vectorizer that works better with short texts
         self.vectorizer = TfidfVectorizer(
             max_features=5000,
             stop_words=None,  # Keep all words for short text
-            ngram_range=(1, 3),  # Include trigrams for better matching
+            ngram_range=(1, 2),  # Bigrams; trigrams rarely recur in short comments
             min_df=1,
             max_df=1.0,  # Don't filter common words in small corpus
             analyzer='word',
-            token_pattern=r'\b\w+\b'  # Match word boundaries
+            token_pattern=r'\b\w+\b',  # Match word boundaries
+            norm=None,  # CorpusIndex applies IDF and norms itself
+            dtype=np.float32  # Scores end up as whole percents; halves matrix size
+        )
+        # Stateless (no fit) vectorizer for ad-hoc pairwise similarity:
+        # tokens hash straight into a fixed-width space, rows come out
+        # L2-normalized, so cosine is a single sparse dot product
+        if use_char_ngrams:
+            self.hashing_vectorizer = HashingVectorizer(
+                n_features=2 ** 13,
+                ngram_range=(3, 5),
+                analyzer='char_wb',
+                alternate_sign=False,
+                norm='l2',
+                dtype=np.float32
+            )
+        else:
+            self.hashing_vectorizer = HashingVectorizer(
+                n_features=2 ** 14,
+                ngram_range=(1, 2),
+                analyzer='word',
+                token_pattern=r'\b\w+\b',
+                alternate_sign=False,
+                norm='l2',
+                dtype=np.float32
+            )
+        # (manifesto_id, comparison texts) -> CorpusIndex; wrapped per instance
+        # so the cache key doesn't include `self`
+        self._manifesto_index = lru_cache(maxsize=self.MANIFESTO_INDEX_CACHE_SIZE)(
+            self._build_manifesto_index
         )
-        self._is_fitted = False
     
     def _preprocess(self, text: str) -> str:
-        """Clean and normalize text for comparison."""
+        """Clean and normalize text for comparison (memoized, see _preprocess_text)."""
         if not text:
             return ""
-        # Lowercase
-        text = text.lower()
-        # Remove URLs
-        text = re.sub(r'http\S+|www\S+', '', text)
-        # Remove special characters but keep spaces
-        text = re.sub(r'[^\w\s]', ' ', text)
-        # Normalize whitespace
-        text = ' '.join(text.split())
-        return text
+        return _preprocess_text(text)
     
-    def _word_overlap_score(self, text1: str, text2: str) -> float:
-        """Simple word overlap for very short texts."""
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
+    def _word_overlap_score(self, words1: List[str], words2: List[str]) -> float:
+        """Simple word overlap for very short (already preprocessed and split) texts."""
+        words1 = set(words1)
+        words2 = set(words2)
         if not words1 or not words2:
             return 0.0
         intersection = words1 & words2
@@ -73,7 +228,8 @@ class SimilarityService:
     
     def compute_similarity(self, text1: str, text2: str) -> int:
         """
-        Compute cosine similarity between two texts.
+        Compute cosine similarity between two texts (hashed term
+        frequencies; IDF only matters against a corpus, see fit_corpus).
         Returns: Integer 0-100 (percentage)
         """
         text1 = self._preprocess(text1)
@@ -82,27 +238,49 @@ class SimilarityService:
         if not text1 or not text2:
             return 0
         
-        try:
-            # For very short texts, use word overlap as fallback
-            words1 = text1.split()
-            words2 = text2.split()
-            
-            if len(words1) < 3 or len(words2) < 3:
-                # Use Jaccard similarity for very short texts
-                jaccard = self._word_overlap_score(text1, text2)
-                return int(jaccard * 100)
-            
-            # Fit and transform on both texts
-            tfidf_matrix = self.vectorizer.fit_transform([text1, text2])
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            return int(similarity * 100)
-        except Exception as e:
-            print(f"Similarity computation error: {e}")
+        # For very short texts, use word overlap as fallback
+        words1 = text1.split()
+        words2 = text2.split()
+        
+        if len(words1) < 3 or len(words2) < 3:
+            # Use Jaccard similarity for very short texts
+            jaccard = self._word_overlap_score(words1, words2)
+            return int(jaccard * 100)
+        
+        # Hash both texts (no fit) - rows are unit length, so the
+        # cosine is just their dot product
+        matrix = self.hashing_vectorizer.transform([text1, text2])
+        if not matrix.nnz:
             return 0
+        return int(matrix[0].multiply(matrix[1]).sum() * 100 + _SCORE_EPS)
     
-    def compute_max_similarity(self, comment: str, documents: List[str]) -> Tuple[int, int]:
+    def fit_corpus(self, documents: List[str]) -> Optional[CorpusIndex]:
+        """
+        Fit a TF-IDF index over a fixed document set for repeated queries.
+        Returns None if every document is empty after preprocessing.
+        """
+        processed_docs = [self._preprocess(doc) for doc in documents]
+        # Filter out empty docs
+        valid_docs = [(i, doc) for i, doc in enumerate(processed_docs) if doc]
+        
+        if not valid_docs:
+            return None
+        
+        return CorpusIndex(
+            clone(self.vectorizer),
+            [doc for _, doc in valid_docs],
+            [i for i, _ in valid_docs]
+        )
+    
+    def compute_max_similarity(
+        self,
+        comment: str,
+        documents: List[str],
+        index: Optional[CorpusIndex] = None
+    ) -> Tuple[int, int]:
         """
         Compute max similarity between comment and a list of documents.
+        Pass `index` (from fit_corpus(documents)) to skip refitting.
         Returns: (max_similarity_score, index_of_best_match)
         """
         comment = self._preprocess(comment)
@@ -110,46 +288,31 @@ class SimilarityService:
         if not comment or not documents:
             return (0, -1)
         
-        processed_docs = [self._preprocess(doc) for doc in documents]
-        # Filter out empty docs
-        valid_docs = [(i, doc) for i, doc in enumerate(processed_docs) if doc]
-        
-        if not valid_docs:
+        if index is None:
+            index = self.fit_corpus(documents)
+        if index is None:
+            # Every document was empty after preprocessing - nothing to fit
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("No comparable text in %d document(s); similarity is 0", len(documents))
             return (0, -1)
         
-        try:
-            all_texts = [comment] + [doc for _, doc in valid_docs]
-            tfidf_matrix = self.vectorizer.fit_transform(all_texts)
-            
-            # Compute similarity between comment (index 0) and all documents
-            similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])[0]
-            
-            max_idx = int(np.argmax(similarities))
-            max_score = int(similarities[max_idx] * 100)
-            original_idx = valid_docs[max_idx][0]
-            
-            return (max_score, original_idx)
-        except Exception as e:
-            print(f"Max similarity computation error: {e}")
-            return (0, -1)
+        return index.max_similarity(comment)
     
-    def check_promise_relevance(
-        self, 
-        comment: str, 
+    def _build_manifesto_index(self, manifesto_id: int, documents: Tuple[str, ...]) -> Optional[CorpusIndex]:
+        """
+        Fitted index for a manifesto's comparison texts (cached by
+        _manifesto_index). The texts are part of the key, so edited
+        promises - or ids reused after a reseed - simply miss the cache.
+        """
+        return self.fit_corpus(list(documents))
+    
+    def _comparison_texts(
+        self,
         manifesto_title: str,
         manifesto_description: str,
         promises: List[Dict] = None
-    ) -> Dict:
-        """
-        Check if comment is relevant to the manifesto and its promises.
-        
-        Returns: {
-            'similarity_score': int (0-100),
-            'matched_promise_id': int or None,
-            'is_relevant': bool,
-            'flag_reason': str or None ('off_topic', 'low_relevance', None)
-        }
-        """
+    ) -> Tuple[List[str], List[Tuple[str, Optional[int]]]]:
+        """Texts a comment is compared against for relevance, with their (kind, id)."""
         # Build list of texts to compare against
         comparison_texts = []
         text_ids = []
@@ -166,8 +329,10 @@ class SimilarityService:
                 comparison_texts.append(promise_text)
                 text_ids.append(('promise', p.get('id')))
         
-        max_score, best_idx = self.compute_max_similarity(comment, comparison_texts)
-        
+        return comparison_texts, text_ids
+    
+    def _relevance_result(self, max_score: int, best_idx: int, text_ids: List[Tuple[str, Optional[int]]]) -> Dict:
+        """Relevance verdict for a max similarity score."""
         # Determine relevance and flag reason
         flag_reason = None
         if max_score < self.RELEVANCE_LOW:
@@ -186,40 +351,131 @@ class SimilarityService:
             'flag_reason': flag_reason
         }
     
+    def check_promise_relevance(
+        self, 
+        comment: str, 
+        manifesto_title: str,
+        manifesto_description: str,
+        promises: List[Dict] = None,
+        manifesto_id: Optional[int] = None
+    ) -> Dict:
+        """
+        Check if comment is relevant to the manifesto and its promises.
+        With `manifesto_id`, the fitted TF-IDF index is cached per manifesto.
+        
+        Returns: {
+            'similarity_score': int (0-100),
+            'matched_promise_id': int or None,
+            'is_relevant': bool,
+            'flag_reason': str or None ('off_topic', 'low_relevance', None)
+        }
+        """
+        comparison_texts, text_ids = self._comparison_texts(
+            manifesto_title, manifesto_description, promises
+        )
+        
+        index = None
+        if manifesto_id is not None:
+            index = self._manifesto_index(manifesto_id, tuple(comparison_texts))
+        max_score, best_idx = self.compute_max_similarity(comment, comparison_texts, index)
+        
+        return self._relevance_result(max_score, best_idx, text_ids)
+    
+    def minhash(self, text: str) -> bytes:
+        """
+        b-bit MinHash signature of a text: MINHASH_PERMUTATIONS min-hashes
+        over its character 5-grams, each truncated to its low byte.
+        Compute once per comment and store it (LargeBinary column).
+        """
+        text = self._preprocess(text)
+        if len(text) <= SHINGLE_SIZE:
+            shingles = {text}
+        else:
+            shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+        
+        hashes = np.fromiter(
+            (int.from_bytes(blake2b(sh.encode(), digest_size=4).digest(), 'little') for sh in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        # Universal hashing (a*x + b) mod p, one column per permutation;
+        # 32-bit x, a and b keep a*x + b below 2**64
+        permuted = (hashes[:, None] * _MINHASH_A + _MINHASH_B) % _MINHASH_PRIME
+        return (permuted.min(axis=0) & 0xFF).astype(np.uint8).tobytes()
+    
+    def _minhash_similarity(
+        self,
+        signature: bytes,
+        candidates: List[bytes]
+    ) -> Tuple[int, int]:
+        """
+        Max estimated Jaccard similarity (of character 5-gram sets) between
+        a signature and candidate signatures.
+        Candidates are scanned in blocks of MINHASH_SCAN_BLOCK; the scan
+        ends early only on a score of 100, which no later block can beat
+        (the score is persisted, so it must be the true max).
+        Returns: (max_similarity_score 0-100, index of best match)
+        """
+        query = np.frombuffer(signature, dtype=np.uint8)
+        others = np.frombuffer(b"".join(candidates), dtype=np.uint8).reshape(-1, MINHASH_PERMUTATIONS)
+        best_score, best_idx = 0, 0
+        for start in range(0, len(others), self.MINHASH_SCAN_BLOCK):
+            matches = (others[start:start + self.MINHASH_SCAN_BLOCK] == query).sum(axis=1)
+            block_idx = int(np.argmax(matches))
+            # With 8-bit minhashes, unrelated sets still agree 1/256 of the time
+            agreement = matches[block_idx] / MINHASH_PERMUTATIONS
+            score = int(max(0.0, (agreement - 1 / 256) / (1 - 1 / 256)) * 100)
+            if score > best_score:
+                best_score, best_idx = score, start + block_idx
+            if best_score == 100:
+                break
+        return (best_score, best_idx)
+    
     def check_spam_similarity(
         self, 
         comment: str, 
         recent_comments: List[str],
-        same_author_comments: List[str] = None
+        same_author_comments: List[str] = None,
+        signatures: List[bytes] = None
     ) -> Dict:
         """
         Check if comment is similar to recent comments (spam detection).
+        Near-duplicate check on MinHash signatures of character 5-grams;
+        pass stored `signatures` (recent + same-author, in that order) to
+        skip hashing the texts again.
         
         Returns: {
             'spam_score': int (0-100),
             'is_spam': bool,
-            'matched_comment_idx': int or None
+            'matched_comment_idx': int or None,
+            'signature': bytes (MinHash of comment, to store)
         }
         """
-        all_comments = list(recent_comments)
+        comment_signature = self.minhash(comment)
         
-        # Also check same author's recent comments
-        if same_author_comments:
-            all_comments.extend(same_author_comments)
+        if signatures is None:
+            all_comments = list(recent_comments)
+            
+            # Also check same author's recent comments
+            if same_author_comments:
+                all_comments.extend(same_author_comments)
+            
+            signatures = [self.minhash(c) for c in all_comments]
         
-        if not all_comments:
+        if not signatures or not self._preprocess(comment):
             return {
                 'spam_score': 0,
                 'is_spam': False,
-                'matched_comment_idx': None
+                'matched_comment_idx': None,
+                'signature': comment_signature
             }
         
-        max_score, best_idx = self.compute_max_similarity(comment, all_comments)
+        max_score, best_idx = self._minhash_similarity(comment_signature, signatures)
         
         return {
             'spam_score': max_score,
             'is_spam': max_score >= self.SPAM_THRESHOLD,
-            'matched_comment_idx': best_idx if max_score >= self.SPAM_THRESHOLD else None
+            'matched_comment_idx': best_idx if max_score >= self.SPAM_THRESHOLD else None,
+            'signature': comment_signature
         }
     
     def analyze_comment(
@@ -229,10 +485,14 @@ class SimilarityService:
         manifesto_description: str,
         recent_comments: List[str] = None,
         same_author_comments: List[str] = None,
-        promises: List[Dict] = None
+        promises: List[Dict] = None,
+        manifesto_id: Optional[int] = None,
+        spam_signatures: List[bytes] = None
     ) -> Dict:
         """
         Full analysis of a comment for moderation.
+        `spam_signatures` are stored MinHashes of recent + same-author
+        comments; when given, those texts are not re-hashed.
         
         Returns: {
             'state': str ('active', 'auto_flagged', 'quarantined'),
@@ -240,6 +500,7 @@ class SimilarityService:
             'similarity_score': int,
             'matched_promise_id': int or None,
             'spam_similarity_score': int,
+            'content_minhash': bytes,
             'details': {...}
         }
         """
@@ -248,16 +509,22 @@ class SimilarityService:
             comment, 
             manifesto_title, 
             manifesto_description,
-            promises
+            promises,
+            manifesto_id
         )
         
         # Check spam similarity
         spam = self.check_spam_similarity(
             comment,
             recent_comments or [],
-            same_author_comments
+            same_author_comments,
+            spam_signatures
         )
         
+        return self._moderation_result(relevance, spam)
+    
+    def _moderation_result(self, relevance: Dict, spam: Dict) -> Dict:
+        """Combine relevance and spam checks into a moderation decision."""
         # Determine final state
         state = 'active'
         auto_flag_reason = None
@@ -280,6 +547,7 @@ class SimilarityService:
             'similarity_score': relevance['similarity_score'],
             'matched_promise_id': relevance['matched_promise_id'],
             'spam_similarity_score': spam['spam_score'],
+            'content_minhash': spam['signature'],
             'details': {
                 'relevance': relevance,
                 'spam': spam
@@ -289,10 +557,15 @@ class SimilarityService:
 
 # Singleton instance
 _similarity_service = None
+_similarity_service_lock = threading.Lock()
 
 def get_similarity_service() -> SimilarityService:
     """Get singleton instance of SimilarityService."""
     global _similarity_service
     if _similarity_service is None:
-        _similarity_service = SimilarityService()
+        # Sync endpoints run in a threadpool; make sure only one instance
+        # (and one manifesto index cache) is ever created
+        with _similarity_service_lock:
+            if _similarity_service is None:
+                _similarity_service = SimilarityService()
     return _similarity_service
@@ -9,47 +9,55 @@ This module tests complete user journeys with realistic data:
 4. Vote Aggregation to Merkle Proof Verification to Status Finalization
 
 Run with: pytest tests/test_scenarios.py -v -s
+(add --runslow for the discussion, aggregation and full lifecycle scenarios)
 """
 
 import pytest
 import hashlib
+import pickle
 import time
 import sys
 import os
 from pathlib import Path
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
+from functools import lru_cache
 from fastapi.testclient import TestClient
+from sqlalchemy import exists, select, text
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from main import app
 from crypto_utils import compute_manifesto_hash, generate_key_pair, create_signature
-from database import SessionLocal, engine
+from database import engine
 from models import Base
 
-client = TestClient(app)
-
-# Import registry for Merkle root access
-from main import registry
-
 # Import registry for Merkle root access
 from main import registry
 
 
 # ============= Test Helper Functions =============
 
-def register_and_verify_representative(representative_data, client=client):
+@lru_cache(maxsize=None)
+def citizen_credential_hashes(name):
+    """(nullifier, credential_hash) for a test citizen, computed once per name."""
+    return (
+        "0x" + hashlib.sha256(f"test_citizen_{name}".encode()).hexdigest(),
+        "0x" + hashlib.sha256(f"cred_{name}".encode()).hexdigest(),
+    )
+
+
+def register_and_verify_representative(representative_data, client):
     """Helper to register a representative (auto-verified in decentralized system)."""
     # Create ZK credential
-    test_nullifier = "0x" + hashlib.sha256(f"test_citizen_{representative_data['name']}".encode()).hexdigest()
+    test_nullifier, credential_hash = citizen_credential_hashes(representative_data['name'])
     
     from models import ZKCredential
     from database import SessionLocal
     db = SessionLocal()
     credential = ZKCredential(
         nullifier_hash=test_nullifier,
-        credential_hash="0x" + hashlib.sha256(f"cred_{representative_data['name']}".encode()).hexdigest(),
+        credential_hash=credential_hash,
         is_valid=True
     )
     db.add(credential)
@@ -77,10 +85,19 @@ def register_and_verify_representative(representative_data, client=client):
 
 # ============= Test Data Fixtures =============
 
-@pytest.fixture
-def test_data():
-    """Comprehensive test data representing real-world scenario."""
-    return {
+@pytest.fixture(scope="session")
+def client():
+    """
+    One TestClient for the whole run. Not entered as a context manager:
+    the startup event would seed demo data that clean_db drops right away.
+    """
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def test_data_snapshot(now):
+    """Comprehensive test data representing real-world scenario, pickled once."""
+    return pickle.dumps({
         "representatives": [
             {
                 "id": 1,
@@ -104,7 +121,7 @@ def test_data():
                 "title": "Build 100 Public Schools by 2026",
                 "description": "I promise to construct 100 new public schools in rural areas within 2 years, with modern facilities and qualified teachers.",
                 "category": "Education",
-                "deadline": (datetime.now(timezone.utc) + timedelta(days=730)).isoformat(),
+                "deadline": (now + timedelta(days=730)).isoformat(),
                 "evidence": ["Budget allocation document", "Site survey reports"],
                 "tags": ["education", "infrastructure", "rural development"]
             },
@@ -112,7 +129,7 @@ def test_data():
                 "title": "Free Healthcare for Children Under 12",
                 "description": "Provide free comprehensive healthcare coverage for all children under 12 years old, including vaccinations and regular checkups.",
                 "category": "Healthcare",
-                "deadline": (datetime.now(timezone.utc) + timedelta(days=365)).isoformat(),
+                "deadline": (now + timedelta(days=365)).isoformat(),
                 "evidence": ["Healthcare budget proposal", "Partnership with hospitals"],
                 "tags": ["healthcare", "children", "welfare"]
             },
@@ -120,7 +137,7 @@ def test_data():
                 "title": "Reduce Traffic Congestion by 40%",
                 "description": "Implement smart traffic management system and expand public transport to reduce city traffic by 40%.",
                 "category": "Infrastructure",
-                "deadline": (datetime.now(timezone.utc) + timedelta(days=540)).isoformat(),
+                "deadline": (now + timedelta(days=540)).isoformat(),
                 "evidence": ["Traffic study report", "Transport expansion plan"],
                 "tags": ["infrastructure", "transport", "smart city"]
             }
@@ -156,26 +173,47 @@ def test_data():
                 "evidence_url": "https://reports.example.com/failed-projects"
             }
         ]
-    }
+    }, protocol=5)
 
 
-@pytest.fixture(autouse=True)
-def clean_db():
-    """Clean database before each test."""
-    # Create fresh tables
+@pytest.fixture
+def test_data(test_data_snapshot):
+    """Fresh deep copy of the scenario data (tests mutate the nested dicts)."""
+    return pickle.loads(test_data_snapshot)
+
+
+@pytest.fixture(scope="session")
+def schema():
+    """Fresh tables once per run (leftovers from an aborted run are dropped)."""
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     yield
-    # Cleanup after test
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clean_db(schema):
+    """
+    Empty the tables a test wrote to (ids restart, as with fresh tables).
+    One SELECT finds the non-empty tables; TRUNCATE rewrites only those.
+    """
+    yield
+    tables = Base.metadata.sorted_tables
+    with engine.begin() as connection:
+        has_rows = connection.execute(
+            select(*(exists().select_from(table).label(table.name) for table in tables))
+        ).one()
+        dirty = [table.name for table, written in zip(tables, has_rows) if written]
+        if dirty:
+            connection.execute(text(f"TRUNCATE {', '.join(dirty)} RESTART IDENTITY CASCADE"))
+
+
 # ============= Scenario 1: Complete Representative Journey =============
 
 class TestRepresentativeJourney:
     """Test complete flow: Registration to Manifesto Creation to Blockchain Submission."""
     
-    def test_representative_registers_and_submits_manifesto(self, test_data):
+    def test_representative_registers_and_submits_manifesto(self, client, test_data):
         """
         Scenario 1: Representative Journey (Fully Decentralized)
         
@@ -193,7 +231,7 @@ class TestRepresentativeJourney:
         manifesto_data = test_data["manifestos"][0]
         
         # Step 1: Simulate ZK authentication (citizen has nullifier)
-        test_nullifier = "0x" + hashlib.sha256(f"test_citizen_{representative['name']}".encode()).hexdigest()
+        test_nullifier, credential_hash = citizen_credential_hashes(representative['name'])
         print(f"\n  → Citizen authenticated with nullifier: {test_nullifier[:20]}...")
         
         # First, create ZK credential for this citizen
@@ -202,7 +240,7 @@ class TestRepresentativeJourney:
         db = SessionLocal()
         credential = ZKCredential(
             nullifier_hash=test_nullifier,
-            credential_hash="0x" + hashlib.sha256(f"cred_{representative['name']}".encode()).hexdigest(),
+            credential_hash=credential_hash,
             is_valid=True
         )
         db.add(credential)
@@ -267,7 +305,7 @@ class TestRepresentativeJourney:
 class TestVoterJourney:
     """Test complete flow: Authentication to ZK Proof to Vote Casting to Verification."""
     
-    def test_voter_authenticates_and_votes(self, test_data):
+    def test_voter_authenticates_and_votes(self, client, test_data, now):
         """
         Scenario 2: Voter Journey
         
@@ -288,7 +326,7 @@ class TestVoterJourney:
         private_key, _, wallet = generate_key_pair()
         
         # Set deadline to past so voting is open
-        past_deadline = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+        past_deadline = (now - timedelta(days=1)).isoformat()
         
         man_response = client.post("/api/manifestos", json={
             **manifesto_data,
@@ -352,10 +390,11 @@ class TestVoterJourney:
 
 # ============= Scenario 3: Community Discussion =============
 
+@pytest.mark.slow
 class TestCommunityDiscussion:
     """Test complete discussion flow: Comment to Reply to Evidence to Moderation."""
     
-    def test_community_discusses_manifesto(self, test_data):
+    def test_community_discusses_manifesto(self, client, test_data):
         """
         Scenario 3: Community Discussion
         
@@ -475,10 +514,11 @@ class TestCommunityDiscussion:
 
 # ============= Scenario 4: Vote Aggregation & Merkle Verification =============
 
+@pytest.mark.slow
 class TestVoteAggregation:
     """Test vote batching, Merkle tree construction, and verification."""
     
-    def test_vote_aggregation_and_merkle_proof(self, test_data):
+    def test_vote_aggregation_and_merkle_proof(self, client, test_data, now):
         """
         Scenario 4: Vote Aggregation
         
@@ -496,7 +536,7 @@ class TestVoteAggregation:
         
         manifesto_data = test_data["manifestos"][0]
         # Set grace period to past so voting is allowed
-        manifesto_data["deadline"] = (datetime.now(timezone.utc) + timedelta(days=365)).isoformat()
+        manifesto_data["deadline"] = (now + timedelta(days=365)).isoformat()
         
         response = client.post("/api/manifestos", json={
             **manifesto_data,
@@ -509,7 +549,7 @@ class TestVoteAggregation:
         from database import SessionLocal
         db = SessionLocal()
         manifesto = db.query(ManifestoModel).filter(ManifestoModel.id == manifesto_id).first()
-        manifesto.grace_period_end = datetime.now(timezone.utc) - timedelta(days=10)
+        manifesto.grace_period_end = now - timedelta(days=10)
         db.commit()
         db.close()
         
@@ -571,7 +611,7 @@ class TestVoteAggregation:
             first_vote = votes_cast[0]
             vote_hash = first_vote["vote_hash"]
             
-            response = client.get(f"/api/votes/verify/{vote_hash}")
+            response = client.get(f"/api/votes/verify/{vote_hash}", params={"manifesto_id": manifesto_id})
             assert response.status_code == 200
             verification = response.json()
             
@@ -580,10 +620,11 @@ class TestVoteAggregation:
 
 # ============= Scenario 5: Full Platform Integration =============
 
+@pytest.mark.slow
 class TestFullPlatformIntegration:
     """Test complete platform flow from registration to finalization."""
     
-    def test_complete_platform_lifecycle(self, test_data):
+    def test_complete_platform_lifecycle(self, client, test_data):
         """
         Scenario 5: Full Platform Integration
         
@@ -58,8 +58,9 @@ export async function submitVote(data: {
   return response.json();
 }
 
-export async function getVoteVerification(voteHash: string) {
-  const response = await fetch(`${API_BASE_URL}/votes/verify/${voteHash}`);
+export async function getVoteVerification(voteHash: string, manifestoId?: number) {
+  const query = manifestoId !== undefined ? `?manifesto_id=${manifestoId}` : '';
+  const response = await fetch(`${API_BASE_URL}/votes/verify/${voteHash}${query}`);
   if (!response.ok) throw new Error('Failed to verify vote');
   return response.json();
 }